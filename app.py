@@ -1,15 +1,21 @@
 import streamlit as st
 import time
-import matplotlib.pyplot as plt
+import weakref
 
 from simulation.state import SimulationState
-from simulation.engine import step_simulation
-from kinetics.base_model import NoInhibitorModel
-from kinetics.competitive import CompetitiveModel
-from kinetics.noncompetitive import NonCompetitiveModel
-from ui.controls import tab_controls
-from ui.visualization import render_simulation
-from ui.plots import render_plot_and_table
+from simulation.engine import step_simulation, run_until_stop
+from simulation.termination import stop_reason, STOP_MESSAGES
+from kinetics.registry import get_model
+from ui.controls import tab_controls, ENGINES
+from simulation.profiling import Profiler, phase
+from simulation.background import BackgroundRuns
+from simulation.cache import run_cached
+from simulation.checkpoint import checkpoint_bytes, load_checkpoint
+from simulation.export import EXPORT_FORMATS, time_course_bytes
+
+# Matplotlib, pandas and the renderers built on them are imported inside
+# the helpers that draw, so the page paints before they load and reruns
+# that draw nothing never need them.
 
 # ---------------------------------------------------
 # Page setup
@@ -28,173 +34,583 @@ def render_html_table(df, font_size=18):
     </div>
     """
 
-#simulator mode
-advanced = st.toggle("Advanced Mode")
+# ---------------------------------------------------
+# Helper to redraw the product plot and stats table
+# ---------------------------------------------------
+# (sampled buffer id, sample count) each stats placeholder last showed
+_stats_drawn = weakref.WeakKeyDictionary()
+
+def show_plot_and_stats(sim, label, plot_placeholder, table_placeholder):
+    from ui.plots import render_plot_and_table
+
+    with phase(sim.profiler, "plot"):
+        fig = session_figure(f"fig_plot_{label}", figsize=(6.4, 4.8))
+        fig_plot, df_stats, df_progress = render_plot_and_table(sim, fig=fig)
+        plot_placeholder.pyplot(fig_plot)
+
+    # The interval stats only change when a sample interval completes
+    sampled = sim.history_product_sampled
+    drawn = (id(sampled), sampled.count)
+    if _stats_drawn.get(table_placeholder) == drawn:
+        return
+    _stats_drawn[table_placeholder] = drawn
+    with phase(sim.profiler, "stats_table"):
+        table_placeholder.markdown(
+            render_html_table(df_stats, font_size=18),
+            unsafe_allow_html=True
+        )
 
 # ---------------------------------------------------
-# Tabs and models
+# Helper to draw the particles (or the counts of the non-spatial engines)
 # ---------------------------------------------------
-if advanced:
-    tab_labels = ["No Inhibitor", "Competitive", "Non-Competitive"]
-    models = {
-        "No Inhibitor": NoInhibitorModel(),
-        "Competitive": CompetitiveModel(),
-        "Non-Competitive": NonCompetitiveModel()
-    }
-else:
-    tab_labels = ["No Inhibitor"]
-    models = {
-        "No Inhibitor": NoInhibitorModel()
-    }
+def show_particles(sim, label, sim_placeholder):
+    from ui.visualization import render_simulation
+
+    if sim.engine == "spatial":
+        with phase(sim.profiler, "render_particles"):
+            sim_placeholder.pyplot(render_simulation(sim, fig=session_figure(f"fig_sim_{label}")))
+    else:
+        sim_placeholder.info(
+            f"{ENGINES[sim.engine]}: {sim.counts['S']:.0f} substrates, "
+            f"{sim.counts['ES']:.0f} ES complexes, {sim.counts['P']:.0f} products"
+        )
 
-tabs = st.tabs(tab_labels)
+# ---------------------------------------------------
+# Helper to show the outputs below a finished run
+# ---------------------------------------------------
+def show_run_results(sim, label):
+    from ui.plots import render_plot_and_table
+
+    st.subheader("Raw time-course data (for initial rate calculation)")
+    with phase(sim.profiler, "progress_table"):
+        fig = session_figure(f"fig_plot_{label}", figsize=(6.4, 4.8))
+        _, _, df_progress = render_plot_and_table(sim, fig=fig)
+        st.dataframe(df_progress, height=400)
+    time_course_downloads(sim, label)
+    show_mean_field(sim, label)
 
 # ---------------------------------------------------
-# Main tab loop
+# Helper to offer the time course as chunked file downloads
 # ---------------------------------------------------
-for tab, label in zip(tabs, tab_labels):
-    with tab:
+def time_course_downloads(sim, label):
+    # Files are only written when a button is clicked
+    name = label.replace(" ", "_").lower()
+    for resolution, title in (("sampled", "sampled"), ("step", "per step")):
+        cols = st.columns(len(EXPORT_FORMATS))
+        for col, (fmt, (extension, mime)) in zip(cols, EXPORT_FORMATS.items()):
+            col.download_button(
+                f"{fmt.upper()} ({title})",
+                data=lambda fmt=fmt, resolution=resolution: time_course_bytes(sim, fmt, resolution),
+                file_name=f"{name}_{resolution}.{extension}",
+                mime=mime,
+                key=f"export_{fmt}_{resolution}_{label}"
+            )
 
-        sim_key = f"sim_{label}"
-        start_key = f"start_{label}"
+# ---------------------------------------------------
+# Helper to show the deterministic limit beside the stochastic run
+# ---------------------------------------------------
+YIELD_MAP_TEMPERATURES = (0, 100, 51)  # linspace of the heat-map axes (slider ranges)
+YIELD_MAP_PH = (0, 14, 29)
+
+# Mean-field curve and yield map per simulation, recomputed only when its settings change
+_mean_field_cache = weakref.WeakKeyDictionary()
+
+def show_mean_field(sim, label):
+    import numpy as np
+    from simulation.meanfield import integrate_grid, yield_map
+    from ui.plots import render_comparison_plot, render_yield_map
+
+    temperatures, pHs = np.linspace(*YIELD_MAP_TEMPERATURES), np.linspace(*YIELD_MAP_PH)
+    env = sim.environment
+    key = (sim.time, env["temperature"], env["pH"], sim.enzyme_count, sim.substrate_count, sim.inhibitor_count)
+    cached = _mean_field_cache.get(sim)
+    if cached is None or cached[0] != key:
+        cached = _mean_field_cache[sim] = (
+            key, *integrate_grid(sim, sim.time), yield_map(sim, temperatures, pHs, steps=sim.time)
+        )
+    _, times, products, yields = cached
+
+    st.subheader("Mean-field (deterministic) limit")
+    col_curve, col_map = st.columns(2)
+
+    with col_curve:
+        fig = render_comparison_plot(
+            {"This run": (sim.time_history, sim.product_history), "Mean-field": (times, products)},
+            fig=session_figure(f"fig_mean_field_{label}")
+        )
+        st.pyplot(fig)
+
+    with col_map:
+        fig = render_yield_map(temperatures, pHs, yields, marker=(env["temperature"], env["pH"]),
+                               fig=session_figure(f"fig_yield_map_{label}"))
+        st.pyplot(fig)
+        st.caption(f"Yield after {sim.time} steps with the current counts; x marks this run.")
 
-        # Initialize simulation state
-        if sim_key not in st.session_state:
-            st.session_state[sim_key] = SimulationState(models[label])
+# ---------------------------------------------------
+# Helper to show the profiling panel
+# ---------------------------------------------------
+def show_profile(sim, label):
+    import pandas as pd
+
+    prof = sim.profiler
+    with st.expander("Profiling (per-phase timings)"):
+        st.dataframe(prof.summary().round(4))
+        st.dataframe(pd.Series(prof.counters, name="Count").to_frame())
+        st.download_button(
+            "Export profile (JSON)",
+            prof.to_json(),
+            file_name=f"profile_{label.replace(' ', '_').lower()}.json",
+            mime="application/json",
+            key=f"profile_json_{label}"
+        )
 
-        sim = st.session_state[sim_key]
+# ---------------------------------------------------
+# Per-session objects (built once, reused by every rerun)
+# ---------------------------------------------------
+TAB_MODELS = {
+    "No Inhibitor": "none",
+    "Competitive": "competitive",
+    "Non-Competitive": "noncompetitive",
+    "Uncompetitive": "uncompetitive",
+    "Mixed": "mixed",
+    "Substrate Inhibition": "substrate_inhibition",
+}
+
+def session_model(label):
+    key = f"model_{label}"
+    if key not in st.session_state:
+        st.session_state[key] = get_model(TAB_MODELS[label])
+    return st.session_state[key]
+
+def session_figure(key, figsize=(6, 4)):
+    if key not in st.session_state:
+        import matplotlib.pyplot as plt
+        st.session_state[key], _ = plt.subplots(figsize=figsize)
+    return st.session_state[key]
+
+def particle_layout(sim):
+    """Settings that shape the particles; the tab re-initializes them when these change."""
+    inhibitor_particles = sim.inhibitor_count if sim.explicit_inhibitors and sim.engine == "spatial" else 0
+    return (sim.engine, sim.enzyme_count, sim.substrate_count, inhibitor_particles)
+
+def restore_controls(label, sim):
+    """
+    Reset a tab's widgets to the settings of a loaded state (before the
+    widgets are drawn): their keys are dropped and tab_controls rebuilds
+    them from these overrides.
+    """
+    for key in ("temperature", "pH", "enzyme", "substrate", "engine", "product_sink",
+                "inhibitor", "explicit_inhibitors"):
+        st.session_state.pop(f"{key}_{label}", None)
+    st.session_state[f"control_overrides_{label}"] = {
+        "temperature": int(sim.environment["temperature"]),
+        "pH": float(sim.environment["pH"]),
+        "enzyme_count": sim.enzyme_count,
+        "substrate_count": sim.substrate_count,
+        "inhibitor": sim.inhibitor_count,
+        "explicit_inhibitors": bool(sim.explicit_inhibitors),
+        "engine": sim.engine,
+        "product_sink": sim.product_sink is not None,
+    }
 
-        # ---------------------------------------------------
-        # Controls (ONLY called once!)
-        # ---------------------------------------------------
-        config = tab_controls(label)
+# Client-side playback: record a frame every N steps, refresh plots every chunk
+CLIENT_FRAME_STRIDE = 2
+CLIENT_CHUNK_STEPS = 250
 
-        # Layout columns
-        col_sim, col_right = st.columns([2, 1])
+# Product sink: products drawn (and moved) at most; older ones are only counted
+PRODUCT_SINK_VISIBLE = 100
 
-        with col_sim:
-            sim_placeholder = st.empty()
+# Background runs: live views poll the shared results channel this often (seconds)
+BACKGROUND_POLL_SECONDS = 0.5
 
-        with col_right:
-            plot_placeholder = st.empty()
-            table_placeholder = st.empty()
+# ---------------------------------------------------
+# Helpers for background runs (one worker process per tab)
+# ---------------------------------------------------
+def background_runs():
+    if "background_runs" not in st.session_state:
+        st.session_state["background_runs"] = BackgroundRuns()
+    return st.session_state["background_runs"]
+
+def collect_background_results():
+    """Drain the results channel; finished runs replace their tab's simulation state."""
+    runs = st.session_state.get("background_runs")
+    if runs is None:
+        return
+    runs.poll()
+    for label, run in runs.runs.items():
+        if run.sim is not None:
+            st.session_state[f"sim_{label}"] = run.sim
+            run.sim = None
+
+def draw_background_run(label, run):
+    import pandas as pd
+    from ui.visualization import render_positions
+    from ui.plots import render_comparison_plot
+
+    col_sim, col_right = st.columns([2, 1])
+
+    with col_sim:
+        if run.positions is not None:
+            fig_sim = render_positions(run.positions, run.width, run.height, fig=session_figure(f"fig_bg_sim_{label}"))
+            st.pyplot(fig_sim)
+        elif run.counts is not None:
+            st.info(
+                f"{ENGINES[run.engine]}: {run.counts['S']:.0f} substrates, "
+                f"{run.counts['ES']:.0f} ES complexes, {run.counts['P']:.0f} products"
+            )
 
-        # ---------------------------------------------------
-        # Handle Clean (clears screen only)
-        # ---------------------------------------------------
-        if config.get("clean", False):
+    with col_right:
+        fig_plot = render_comparison_plot(
+            {label: (run.time, run.product)}, fig=session_figure(f"fig_bg_plot_{label}")
+        )
+        st.pyplot(fig_plot)
+        if run.stats is not None:
+            df_stats = pd.DataFrame([run.stats], columns=["Min", "Mean", "Std Dev", "Max"],
+                                    index=["Products per 50 steps"])
+            st.markdown(render_html_table(df_stats, font_size=18), unsafe_allow_html=True)
+
+    if run.error is not None:
+        st.error(run.error)
+    elif run.done:
+        st.success(STOP_MESSAGES[run.reason])
+    else:
+        st.caption(f"Running in a background process... t = {run.time[-1] if len(run.time) else 0}")
+
+@st.fragment(run_every=BACKGROUND_POLL_SECONDS)
+def live_background_run(label):
+    runs = background_runs()
+    runs.poll()
+    draw_background_run(label, runs.runs[label])
+    if not runs.running(label):
+        st.rerun()
+
+def draw_comparison(runs):
+    from ui.plots import render_comparison_plot
+
+    curves = {label: (run.time, run.product) for label, run in runs.runs.items()}
+    st.pyplot(render_comparison_plot(curves, fig=session_figure("fig_comparison")))
+
+@st.fragment(run_every=BACKGROUND_POLL_SECONDS)
+def live_comparison():
+    runs = background_runs()
+    runs.poll()
+    draw_comparison(runs)
+    if not runs.running():
+        st.rerun()
 
-            #reset simulation state
-            st.session_state[sim_key] = SimulationState(models[label])
+# ---------------------------------------------------
+# One tab: controls, run and outputs
+# ---------------------------------------------------
+@st.fragment
+def tab_view(label):
+    """
+    Everything inside one tab. As a fragment, a widget change in this tab
+    reruns only this function; the other tabs keep their last output.
+    """
+    model = session_model(label)
+    sim_key = f"sim_{label}"
+    start_key = f"start_{label}"
+    layout_key = f"layout_{label}"
+
+    # Initialize simulation state
+    if sim_key not in st.session_state:
+        st.session_state[sim_key] = SimulationState(model)
+
+    # A checkpoint loaded on the previous run replaces the state and the control values
+    loaded = st.session_state.pop(f"loaded_checkpoint_{label}", None)
+    if loaded is not None:
+        restore_controls(label, loaded)
+        st.session_state[sim_key] = loaded
+        st.session_state[layout_key] = particle_layout(loaded)
+        st.session_state[start_key] = False
+
+    sim = st.session_state[sim_key]
+
+    # ---------------------------------------------------
+    # Controls (ONLY called once!)
+    # ---------------------------------------------------
+    config = tab_controls(
+        label, uses_inhibitor=model.uses_inhibitor,
+        overrides=st.session_state.get(f"control_overrides_{label}")
+    )
+    st.session_state[f"config_{label}"] = config
+
+    # Layout columns
+    col_sim, col_right = st.columns([2, 1])
+
+    with col_sim:
+        sim_placeholder = st.empty()
+
+    with col_right:
+        plot_placeholder = st.empty()
+        table_placeholder = st.empty()
+
+    # ---------------------------------------------------
+    # Handle Clean (clears screen only)
+    # ---------------------------------------------------
+    if config.get("clean", False):
+
+        #reset simulation state
+        st.session_state[sim_key] = SimulationState(model)
+        st.session_state.pop(layout_key, None)
+
+        sim_placeholder.empty()
+        plot_placeholder.empty()
+        table_placeholder.empty()
+
+        st.session_state[start_key] = False
+        if "background_runs" in st.session_state:
+            st.session_state["background_runs"].stop(label)
+
+        st.success("Simulator reset! Remember to modify the settings before running your next simulation!!!")
+        return
+
+
+    # ---------------------------------------------------
+    # Update simulation parameters
+    # ---------------------------------------------------
+    sim.update_environment(config)
+    sim.enzyme_count = config["enzyme_count"]
+    sim.substrate_count = config["substrate_count"]
+
+    if model.uses_inhibitor:
+        sim.inhibitor_count = config["inhibitor"]
+    else:
+        sim.inhibitor_count = 0
+    sim.explicit_inhibitors = config["explicit_inhibitors"]
+
+    sim.product_sink = PRODUCT_SINK_VISIBLE if config["product_sink"] else None
+    sim.engine = config["engine"]
+
+    # Reinitialize particles only when a setting that shapes them changed
+    # (a finished run keeps its final particles across reruns; a new layout discards it)
+    layout = particle_layout(sim)
+    if st.session_state.get(layout_key) != layout:
+        sim.reset(seed=sim.seed)
+        st.session_state[layout_key] = layout
+
+    runs = st.session_state.get("background_runs")
+    in_background = runs is not None and label in runs.runs
+
+    # --- Background worker: the run continues across reruns, progress is polled below ---
+    if config.get("start", False) and config["playback"] == "background":
+        sim.reset(seed=config["seed"])
+        sim.profiler = Profiler() if config["profile"] else None
+        background_runs().start(label, sim)
+        st.session_state[start_key] = False
+
+    # --- Only run simulation if Start pressed ---
+    elif config.get("start", False):
+        from ui.visualization import FrameScheduler
+        from ui.animation import FrameBuffer, render_animation
+
+        if "background_runs" in st.session_state:
+            st.session_state["background_runs"].stop(label)
+
+        # --- Clean simulation data (keep user-selected parameters) ---
+        sim.reset(seed=config["seed"])        # re-generate enzyme & substrate positions, clear histories
+
+        # Clear placeholders
+        sim_placeholder.empty()
+        plot_placeholder.empty()
+        table_placeholder.empty()
+
+        # Reset start flag to prevent loops from overlapping
+        st.session_state[start_key] = True
+
+        # Reload sim reference
+        sim = st.session_state[sim_key]
 
-            sim_placeholder.empty()
-            plot_placeholder.empty()
-            table_placeholder.empty()
+        # Fresh profiler per run (None keeps instrumentation off)
+        sim.profiler = Profiler() if config["profile"] else None
+
+        # --- Continuous simulation loop ---
+        running = True
+
+        # --- Fast-forward: run headless to the stop rule, then show everything at once ---
+        if config["playback"] == "fast":
+            # Seeded runs come from the shared cache when another session already computed them
+            with st.spinner("Computing simulation..."):
+                if config["seed"] is not None:
+                    sim, reason, snapshots, cache_hit = run_cached(sim, snapshot_stride=CLIENT_FRAME_STRIDE)
+                    st.session_state[sim_key] = sim
+                else:
+                    reason, snapshots = run_until_stop(sim, snapshot_stride=CLIENT_FRAME_STRIDE)
+                    cache_hit = False
+
+            show_plot_and_stats(sim, label, plot_placeholder, table_placeholder)
+            if snapshots is not None:
+                frames = FrameBuffer(sim.width, sim.height)
+                frames.add_snapshots(snapshots)
+                with sim_placeholder.container():
+                    render_animation(frames)
+            st.success(STOP_MESSAGES[reason])
+            if cache_hit:
+                st.caption(f"Loaded from the result cache (seed {sim.seed}).")
+            running = False
+
+        scheduler = FrameScheduler(every=config["redraw_every"])
+
+        # Client-side playback: compact frames go to the browser once the run is done
+        client_side = config["playback"] == "client" and sim.engine == "spatial"
+        if client_side:
+            frames = FrameBuffer(sim.width, sim.height)
+            frames.add(sim)
+
+        while running:
+            t0 = time.perf_counter()
+            step_simulation(sim)
+            scheduler.record_steps(time.perf_counter() - t0)
+
+            # Stop rules (plateau or all substrate consumed)
+            with phase(sim.profiler, "stop_check"):
+                reason = stop_reason(sim)
+            running = reason is None
+
+            if client_side:
+                # Record frames; refresh plot and stats once per chunk only
+                if sim.time % CLIENT_FRAME_STRIDE == 0 or not running:
+                    with phase(sim.profiler, "record_frame"):
+                        frames.add(sim)
+                if sim.time % CLIENT_CHUNK_STEPS == 0 or not running:
+                    sim_placeholder.info(f"Computing trajectory... step {sim.time}")
+                    show_plot_and_stats(sim, label, plot_placeholder, table_placeholder)
+
+            # Redraw only every k-th step (and always the final state)
+            elif scheduler.due(sim.time) or not running:
+                t0 = time.perf_counter()
+
+                # Particle animation (the non-spatial engines have no positions)
+                show_particles(sim, label, sim_placeholder)
 
-            if f"fig_sim_{label}" in st.session_state:
-                del st.session_state[f"fig_sim_{label}"]
-            if f"fig_plot_{label}" in st.session_state:
-                del st.session_state[f"fig_plot_{label}"]
+                # Product plot + stats table
+                show_plot_and_stats(sim, label, plot_placeholder, table_placeholder)
 
-            st.session_state[start_key] = False
+                scheduler.record_frame(sim.time, time.perf_counter() - t0)
 
-            st.success("Simulator reset! Remember to modify the settings before running your next simulation!!!")
-            st.stop()
+            if reason is not None:
+                st.success(STOP_MESSAGES[reason])
 
+        if client_side:
+            with sim_placeholder.container():
+                render_animation(frames)
 
-        # ---------------------------------------------------
-        # Update simulation parameters
-        # ---------------------------------------------------
-        sim.update_environment(config)
-        sim.enzyme_count = config["enzyme_count"]
-        sim.substrate_count = config["substrate_count"]
+        show_run_results(sim, label)
 
-        if label != "No Inhibitor":
-            sim.inhibitor_count = config["inhibitor"]
-        else:
-            sim.inhibitor_count = 0
-
-        # Reinitialize particles if counts changed
-        if (
-            sim.enzyme_count != len(sim.enzymes)
-            or sim.substrate_count != len(sim.substrates)
-        ):
-            sim.initialize_particles()
-
-        # --- Only run simulation if Start pressed ---
-        if config.get("start", False):
-
-            # --- Clean simulation data (keep user-selected parameters) ---
-            sim.initialize_particles()        # re-generate enzyme & substrate positions
-            sim.products = []
-            sim.complexes = []
-            sim.time = 0
-            sim.step_counter = 0
-            sim.time_history = []
-            sim.product_history = []
-            sim.rate_history = []
-            sim.history_time_sampled = []
-            sim.history_product_sampled = []
-    
-            # Clear placeholders
-            sim_placeholder.empty()
-            plot_placeholder.empty()
-            table_placeholder.empty()
-    
-            # Delete figures so new ones are created
-            if f"fig_sim_{label}" in st.session_state:
-                del st.session_state[f"fig_sim_{label}"]
-            if f"fig_plot_{label}" in st.session_state:
-                del st.session_state[f"fig_plot_{label}"]
-
-            # Reset start flag to prevent loops from overlapping
-            st.session_state[start_key] = True
-
-            # Reload sim reference
-            sim = st.session_state[sim_key]
-
-            # --- Initialize reusable figures ---
-            st.session_state[f"fig_sim_{label}"], _ = plt.subplots(figsize=(6, 4))
-            st.session_state[f"fig_plot_{label}"], _ = plt.subplots()
-    
-            # --- Continuous simulation loop ---
-            running = True
-            plateau_threshold = 1        # minimal products per interval
-            plateau_intervals = 2        # consecutive low-activity intervals
-
-            while running:
-                step_simulation(sim)
-
-                # Particle animation
-                fig_sim = render_simulation(sim, fig=st.session_state[f"fig_sim_{label}"])
-                sim_placeholder.pyplot(fig_sim)
+        time.sleep(0.05)
 
-                # Product plot + stats table
-                fig_plot, df_stats, df_progress = render_plot_and_table(sim, fig=st.session_state[f"fig_plot_{label}"])
-                plot_placeholder.pyplot(fig_plot)
-                table_placeholder.markdown(
-                    render_html_table(df_stats, font_size=18),
+        # The run is over: later reruns of this tab must not reset and re-run it
+        st.session_state[start_key] = False
+
+    # --- A finished (or loaded) run kept across reruns: redraw it without re-running ---
+    elif sim.time > 0 and not in_background:
+        show_particles(sim, label, sim_placeholder)
+        show_plot_and_stats(sim, label, plot_placeholder, table_placeholder)
+        reason = stop_reason(sim)
+        if reason is not None:
+            st.success(STOP_MESSAGES[reason])
+        show_run_results(sim, label)
+
+    # --- Background run of this tab (live while running, final result afterwards) ---
+    if in_background:
+        if runs.running(label):
+            live_background_run(label)
+        else:
+            draw_background_run(label, runs.runs[label])
+
+    # --- Profiling panel (kept across reruns until the next Start) ---
+    if sim.profiler is not None and sim.profiler.timings:
+        show_profile(sim, label)
+
+    # ---------------------------------------------------
+    # Checkpoint (save the state, resume it later or after a restart)
+    # ---------------------------------------------------
+    with st.expander("Checkpoint (save / resume)"):
+        st.download_button(
+            "Download checkpoint",
+            data=lambda: checkpoint_bytes(sim),
+            file_name=f"{label.replace(' ', '_').lower()}_t{sim.time}.ckpt",
+            mime="application/octet-stream",
+            key=f"checkpoint_download_{label}"
+        )
+        upload = st.file_uploader("Resume from a checkpoint", type=["ckpt"], key=f"checkpoint_upload_{label}")
+        if upload is not None and st.button("Load checkpoint", key=f"checkpoint_load_{label}"):
+            try:
+                st.session_state[f"loaded_checkpoint_{label}"] = load_checkpoint(upload.getvalue(), model=model)
+            except ValueError as exc:
+                st.error(str(exc))
+            else:
+                st.rerun(scope="fragment")
+        if sim.time > 0 and st.button("Continue this run in the background", key=f"continue_{label}"):
+            sim.profiler = Profiler() if config["profile"] else None
+            background_runs().start(label, sim)
+            st.rerun(scope="fragment")
+
+    # ---------------------------------------------------
+    # Replicate ensemble (mean curve + confidence bands)
+    # ---------------------------------------------------
+    with st.expander("Replicate ensemble (error bars)"):
+        # Replicas run the spatial engine with a global inhibitor level (products are only counted,
+        # so the product sink makes no difference)
+        if sim.engine != "spatial" or sim.explicit_inhibitors:
+            st.info(
+                "Replicate ensembles simulate the spatial engine without inhibitor particles. "
+                "Switch to that setup to compare replicas with this run."
+            )
+        else:
+            replicas = st.number_input(
+                "Replicas", 2, 1000, value=100, step=10, key=f"replicas_{label}"
+            )
+            if st.button("Run ensemble", key=f"ensemble_btn_{label}"):
+                import matplotlib.pyplot as plt
+                from simulation.ensemble import Ensemble
+                from ui.plots import render_ensemble_plot
+
+                ensemble = Ensemble(sim, replicas=replicas).run()
+                fig_ens = render_ensemble_plot(ensemble.summary())
+                st.pyplot(fig_ens)
+                plt.close(fig_ens)
+                st.markdown(
+                    render_html_table(ensemble.interval_stats(), font_size=18),
                     unsafe_allow_html=True
                 )
-                
-                # Plateau stop rule
-                if len(sim.history_product_sampled) >= plateau_intervals + 1:
-                    recent_samples = sim.history_product_sampled[-(plateau_intervals + 1):]
-                    diffs = [recent_samples[i+1] - recent_samples[i] for i in range(plateau_intervals)]
-                    if all(diff <= plateau_threshold for diff in diffs):
-                        running = False
-                        st.success("Simulation finished: product formation plateau reached.")
-
-                # Stop if all substrate consumed
-                if len(sim.substrates) == 0:
-                    running = False
-                    st.success("Simulation finished: all substrates consumed.")
-            
-            st.subheader("Raw time-course data (for initial rate calculation)")
-            fig_plot, df_stats, df_progress = render_plot_and_table(sim, fig=st.session_state[f"fig_plot_{label}"])
-            st.markdown(
-                render_html_table(df_progress, font_size=24),
-                unsafe_allow_html=True
-            )
 
-            time.sleep(0.05)
+#simulator mode
+advanced = st.toggle("Advanced Mode")
+
+# Pick up results of background runs finished since the last rerun
+collect_background_results()
+
+# ---------------------------------------------------
+# Tabs
+# ---------------------------------------------------
+tab_labels = list(TAB_MODELS) if advanced else ["No Inhibitor"]
+tabs = st.tabs(tab_labels)
+
+for tab, label in zip(tabs, tab_labels):
+    with tab:
+        tab_view(label)
+
+# ---------------------------------------------------
+# Model comparison (all tabs in parallel background workers)
+# ---------------------------------------------------
+if advanced:
+    st.divider()
+    st.subheader("Model comparison")
+
+    if st.button("Start all models in background", key="start_all_btn"):
+        runs = background_runs()
+        for label in tab_labels:
+            config = st.session_state[f"config_{label}"]
+            sim = st.session_state[f"sim_{label}"]
+            sim.reset(seed=config["seed"])
+            sim.profiler = Profiler() if config["profile"] else None
+            runs.start(label, sim)
+        st.rerun()
+
+    runs = st.session_state.get("background_runs")
+    if runs is not None and runs.runs:
+        if runs.running():
+            live_comparison()
+        else:
+            draw_comparison(runs)
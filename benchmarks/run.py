@@ -0,0 +1,236 @@
+# benchmarks/run.py
+"""
+Seeded performance benchmarks for the engine, collision search and renderers.
+
+Runs without Streamlit (Matplotlib on the Agg backend) and reports steps
+per second plus per-phase time (simulation.profiling) for every scenario.
+
+    python -m benchmarks.run                          # print results
+    python -m benchmarks.run --save base.json         # store a baseline
+    python -m benchmarks.run --compare base.json      # fail on regressions
+    python -m benchmarks.run --quick --only engine    # smaller, filtered run
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from simulation.state import SimulationState
+from simulation.engine import step_simulation
+from simulation.profiling import Profiler
+from simulation.collision import check_collision, find_contacts
+from simulation.meanfield import yield_map
+from simulation.termination import MAX_STEPS
+from kinetics.registry import MODELS, get_model
+from ui.visualization import render_simulation
+from ui.plots import render_plot_and_table
+
+SEED = 12345
+
+# (enzymes, substrates) per scale; the box grows with the count to keep density constant
+SCALES = [(10, 100), (100, 1_000), (1_000, 10_000), (10_000, 100_000)]
+
+
+def make_sim(model="none", enzymes=10, substrates=100, engine="spatial", inhibitors=10):
+    sim = SimulationState(get_model(model), seed=SEED)
+    area = substrates / 100
+    sim.width = int(200 * np.sqrt(area))
+    sim.height = int(100 * np.sqrt(area))
+    sim.enzyme_count = enzymes
+    sim.substrate_count = substrates
+    sim.inhibitor_count = inhibitors if model != "none" else 0
+    sim.engine = engine
+    sim.initialize_particles()
+    return sim
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def bench_steps(sim, steps):
+    """Step `sim` with a profiler attached; return steps/s, mean seconds per phase and counters."""
+    sim.profiler = Profiler()
+    start = time.perf_counter()
+    for _ in range(steps):
+        step_simulation(sim)
+    total = time.perf_counter() - start
+    return {
+        "steps_per_sec": steps / total,
+        "phases": {name: seconds / steps for name, (_, seconds, _) in sim.profiler.timings.items()},
+        "counters": dict(sim.profiler.counters),
+    }
+
+
+# ---------------------------------------------------
+# Scenarios
+# ---------------------------------------------------
+def engine_scenarios(quick):
+    scales = SCALES[:3] if quick else SCALES
+    for enzymes, substrates in scales:
+        for model in MODELS:
+            yield f"engine/{model}/{enzymes}x{substrates}", lambda m=model, e=enzymes, s=substrates: (
+                bench_steps(make_sim(m, e, s), steps_for(s, quick))
+            )
+    for enzymes, substrates in [(1_000, 100_000), (100_000, 10_000_000)]:
+        yield f"engine/well_mixed/{enzymes}x{substrates}", lambda e=enzymes, s=substrates: (
+            bench_steps(make_sim("none", e, s, engine="well_mixed"), 200 if quick else 1000)
+        )
+
+    def mean_field_map(steps):
+        sim = make_sim("competitive", 10, 100, engine="mean_field")
+        dt, _ = timed(lambda: yield_map(sim, np.linspace(0, 100, 51), np.linspace(0, 14, 29), steps=steps))
+        return {"steps_per_sec": steps / dt, "phases": {"yield_map_51x29": dt}}
+    yield "engine/mean_field/yield_map_51x29", lambda: mean_field_map(200 if quick else 1000)
+    # The longest run: the map must cost about as much as after a short one
+    yield "engine/mean_field/yield_map_51x29_long", lambda: mean_field_map(MAX_STEPS)
+
+
+def steps_for(substrates, quick):
+    steps = max(20, min(500, 5_000_000 // (substrates * 10)))
+    return max(10, steps // 5) if quick else steps
+
+
+def collision_scenarios(quick):
+    scales = SCALES[:3] if quick else SCALES
+    for enzymes, substrates in scales:
+        def run(e=enzymes, s=substrates):
+            sim = make_sim("none", e, s)
+            E, S = sim.enzyme_store, sim.substrate_store
+            repeats = 20
+            dt, _ = timed(lambda: [find_contacts(E.x, E.y, E.radius, S.x, S.y, S.radius, sim.width, sim.height)
+                                   for _ in range(repeats)])
+            return {"steps_per_sec": repeats / dt, "phases": {"find_contacts": dt / repeats}}
+        yield f"collision/cell_list/{enzymes}x{substrates}", run
+
+    def legacy():
+        sim = make_sim("none", 10, 100)
+        enzymes, substrates = sim.enzymes, sim.substrates
+        dt, _ = timed(lambda: [check_collision(e, s) for e in enzymes for s in substrates])
+        return {"steps_per_sec": 1 / dt, "phases": {"check_collision_all_pairs": dt}}
+    yield "collision/check_collision/10x100", legacy
+
+
+def render_scenarios(quick):
+    for substrates in (100, 500, 5_000):
+        def run(s=substrates):
+            sim = make_sim("none", 10, s)
+            for _ in range(200):
+                step_simulation(sim)
+            frames = 10 if quick else 30
+            fig_sim, _ = plt.subplots(figsize=(6, 4))
+            fig_plot, _ = plt.subplots()
+
+            t_sim = t_plot = 0.0
+            for _ in range(frames):
+                step_simulation(sim)
+                t0 = time.perf_counter()
+                fig = render_simulation(sim, fig_sim)
+                fig.canvas.draw()
+                t_sim += time.perf_counter() - t0
+                t0 = time.perf_counter()
+                fig, _, _ = render_plot_and_table(sim, fig_plot)
+                fig.canvas.draw()
+                t_plot += time.perf_counter() - t0
+            plt.close(fig_sim)
+            plt.close(fig_plot)
+            return {
+                "steps_per_sec": frames / (t_sim + t_plot),
+                "phases": {"render_simulation": t_sim / frames, "render_plot_and_table": t_plot / frames},
+            }
+        yield f"render/{substrates}", run
+
+
+SUITES = {
+    "engine": engine_scenarios,
+    "collision": collision_scenarios,
+    "render": render_scenarios,
+}
+
+
+# ---------------------------------------------------
+# Baselines
+# ---------------------------------------------------
+def run_suites(names, quick=False, repeat=3):
+    results = {}
+    for suite in names:
+        for name, fn in SUITES[suite](quick):
+            # Best of `repeat` runs: least disturbed by other load on the machine
+            runs = [fn() for _ in range(repeat)]
+            best = max(runs, key=lambda r: r["steps_per_sec"])
+            results[name] = best
+            print(f"{name:45s} {best['steps_per_sec']:12.1f} /s  " + "  ".join(
+                f"{phase}={seconds * 1e3:.3f}ms" for phase, seconds in best["phases"].items()
+            ), file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the scenarios whose throughput fell more than `tolerance` below the baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["steps_per_sec"]
+        after = result["steps_per_sec"]
+        if after < before * (1 - tolerance):
+            regressions.append((name, before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Enzymulator performance benchmarks.")
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITES), default=list(SUITES))
+    parser.add_argument("--quick", action="store_true", help="smaller scales and fewer steps")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario (best is kept)")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed throughput drop before a scenario counts as regressed")
+    args = parser.parse_args(argv)
+
+    results = run_suites(args.only, quick=args.quick, repeat=args.repeat)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "machine": platform.platform(),
+            "seed": SEED,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.1f}/s -> {after:.1f}/s "
+                  f"({(after / before - 1) * 100:+.0f}%)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}", file=sys.stderr)
+
+    if not args.save:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
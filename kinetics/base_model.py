@@ -1,6 +1,74 @@
-class NoInhibitorModel:
+# kinetics/base_model.py
+"""
+Kinetic-model plugin interface.
+
+A model scales the base bind and catalysis probabilities. The spatial
+engine evaluates it once per step over arrays:
+
+    binding_factors(sim, enzymes, substrates)   one factor per candidate contact
+    catalysis_factors(sim, enzymes)             one factor per ES complex
+
+where enzymes / substrates are index arrays into sim.enzyme_store and
+sim.substrate_store (a scalar result broadcasts). Engines without
+particles (well-mixed, replica ensembles, tiled domains) use the scalar
+mean-field hooks binding_modifier(sim) / catalysis_modifier(sim), which
+the array hooks fall back to by default, so a simple model only has to
+override the scalars. Engines that keep several systems at once pass a
+Conditions view with array-valued counts to the scalar hooks, so a model
+should write them elementwise. Register new models with
+kinetics.registry.register_model.
+"""
+
+import numpy as np
+
+from kinetics.local import local_counts
+
+
+class KineticModel:
+    uses_inhibitor = False  # whether sim.inhibitor_count (or inhibitor particles) matter
+
+    # --- Mean-field hooks ---
     def binding_modifier(self, sim):
         return 1.0
 
     def catalysis_modifier(self, sim):
         return 1.0
+
+    # --- Array hooks (spatial engine) ---
+    def binding_factors(self, sim, enzymes, substrates):
+        return self.binding_modifier(sim)
+
+    def catalysis_factors(self, sim, enzymes):
+        return self.catalysis_modifier(sim)
+
+
+class Conditions:
+    """
+    A simulation as the mean-field hooks see it, with some attributes
+    replaced, e.g. Conditions(sim, substrates_remaining=counts) with the
+    live substrate count of every replica as an array. Anything not
+    replaced comes from the wrapped simulation.
+    """
+
+    def __init__(self, sim, **overrides):
+        self._sim = sim
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(self._sim, name)
+
+
+def inhibitor_level(sim, enzymes):
+    """
+    Inhibitor count seen by each of `enzymes`: the local, box-equivalent
+    count of inhibitor particles when sim.explicit_inhibitors is on,
+    otherwise the global sim.inhibitor_count (a scalar).
+    """
+    if not sim.explicit_inhibitors or sim.engine != "spatial":
+        return sim.inhibitor_count
+    unique, inverse = np.unique(enzymes, return_inverse=True)
+    return local_counts(sim, sim.inhibitor_store, unique)[inverse]
+
+
+class NoInhibitorModel(KineticModel):
+    """Base probabilities unchanged."""
@@ -1,8 +1,13 @@
-class CompetitiveModel:
+from kinetics.base_model import KineticModel, inhibitor_level
+
+
+class CompetitiveModel(KineticModel):
+    """Inhibitor competes with the substrate for free enzymes: binding is scaled down."""
     Ki = 20
+    uses_inhibitor = True
 
     def binding_modifier(self, sim):
         return 1 / (1 + sim.inhibitor_count / self.Ki)
 
-    def catalysis_modifier(self, sim):
-        return 1.0
+    def binding_factors(self, sim, enzymes, substrates):
+        return 1 / (1 + inhibitor_level(sim, enzymes) / self.Ki)
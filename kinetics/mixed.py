@@ -0,0 +1,31 @@
+import numpy as np
+
+from kinetics.base_model import KineticModel, inhibitor_level
+
+
+class MixedModel(KineticModel):
+    """
+    Inhibitor binds the free enzyme (constant Ki, scales binding) and the
+    ES complex (constant Ki_prime, scales catalysis).
+    """
+    Ki = 20
+    Ki_prime = 40
+    uses_inhibitor = True
+
+    def binding_modifier(self, sim):
+        return 1 / (1 + sim.inhibitor_count / self.Ki)
+
+    def catalysis_modifier(self, sim):
+        return 1 / (1 + sim.inhibitor_count / self.Ki_prime)
+
+    def binding_factors(self, sim, enzymes, substrates):
+        return 1 / (1 + inhibitor_level(sim, enzymes) / self.Ki)
+
+    def catalysis_factors(self, sim, enzymes):
+        return 1 / (1 + inhibitor_level(sim, enzymes) / self.Ki_prime)
+
+
+class UncompetitiveModel(MixedModel):
+    """Inhibitor binds only the ES complex, lowering apparent Vmax and Km alike."""
+    Ki = np.inf
+    Ki_prime = 20
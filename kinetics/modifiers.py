@@ -12,3 +12,62 @@ def ph_modifier(enzyme, env):
 
 def activity_modifier(enzyme, env):
     return temperature_modifier(enzyme, env) * ph_modifier(enzyme, env)
+
+
+class ActivityCache:
+    """
+    Memoized activity_modifier values.
+
+    Activity depends only on (optimal_temp, optimal_pH, temperature, pH),
+    so each unique tuple is evaluated once. Arrays of enzyme parameters
+    are reduced to their unique (optimal_temp, optimal_pH) pairs and
+    evaluated in one vectorized call, so heterogeneous populations cost
+    one exp pair per distinct enzyme type rather than per enzyme.
+    """
+
+    max_unique = 1024  # above this many distinct enzyme types, skip memoization
+
+    def __init__(self):
+        self._values = {}
+
+    def invalidate(self):
+        self._values.clear()
+
+    def lookup(self, optimal_temp, optimal_pH, env):
+        """Activity of a single enzyme type in `env`."""
+        key = (float(optimal_temp), float(optimal_pH), float(env["temperature"]), float(env["pH"]))
+        value = self._values.get(key)
+        if value is None:
+            enzyme = _EnzymeParams(key[0], key[1])
+            value = self._values[key] = float(activity_modifier(enzyme, env))
+        return value
+
+    def activity(self, enzymes, env):
+        """Per-enzyme activity array for anything with optimal_temp/optimal_pH arrays."""
+        temps = np.asarray(enzymes.optimal_temp, dtype=float).ravel()
+        phs = np.asarray(enzymes.optimal_pH, dtype=float).ravel()
+        if temps.size == 0:
+            return np.empty(0)
+
+        pairs, inverse = np.unique(np.column_stack((temps, phs)), axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        if len(pairs) > self.max_unique:
+            return activity_modifier(_EnzymeParams(temps, phs), env)
+
+        t, p = float(env["temperature"]), float(env["pH"])
+        keys = [(pt, pp, t, p) for pt, pp in pairs.tolist()]
+        missing = [i for i, key in enumerate(keys) if key not in self._values]
+        if missing:
+            values = activity_modifier(_EnzymeParams(pairs[missing, 0], pairs[missing, 1]), env)
+            for i, value in zip(missing, np.atleast_1d(values)):
+                self._values[keys[i]] = float(value)
+
+        return np.array([self._values[key] for key in keys])[inverse]
+
+
+class _EnzymeParams:
+    """Minimal stand-in carrying the enzyme optima read by the modifiers."""
+
+    def __init__(self, optimal_temp, optimal_pH):
+        self.optimal_temp = optimal_temp
+        self.optimal_pH = optimal_pH
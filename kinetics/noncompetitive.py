@@ -1,8 +1,13 @@
-class NonCompetitiveModel:
-    Ki = 20
+from kinetics.base_model import KineticModel, inhibitor_level
+
 
-    def binding_modifier(self, sim):
-        return 1.0
+class NonCompetitiveModel(KineticModel):
+    """Inhibitor slows catalysis of the complexes."""
+    Ki = 20
+    uses_inhibitor = True
 
     def catalysis_modifier(self, sim):
         return 1 / (1 + sim.inhibitor_count / self.Ki)
+
+    def catalysis_factors(self, sim, enzymes):
+        return 1 / (1 + inhibitor_level(sim, enzymes) / self.Ki)
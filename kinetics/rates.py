@@ -0,0 +1,13 @@
+import numpy as np
+
+# --- Base per-step probabilities (scaled by activity and kinetic model) ---
+BIND_PROBABILITY = 0.2        # per enzyme-substrate contact
+CATALYSIS_PROBABILITY = 0.1   # per ES complex
+
+def hazard(prob):
+    """Convert a per-step probability into a rate (events per step)."""
+    return -np.log1p(-np.clip(prob, 0.0, 1 - 1e-12))
+
+def contact_fraction(enzyme_radius, substrate_radius, width, height):
+    """Chance that a randomly placed substrate touches a given enzyme (well-mixed limit)."""
+    return np.pi * (enzyme_radius + substrate_radius) ** 2 / (width * height)
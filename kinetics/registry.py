@@ -0,0 +1,41 @@
+from kinetics.base_model import NoInhibitorModel
+from kinetics.competitive import CompetitiveModel
+from kinetics.noncompetitive import NonCompetitiveModel
+from kinetics.mixed import MixedModel, UncompetitiveModel
+from kinetics.substrate_inhibition import SubstrateInhibitionModel
+
+# Kinetic models by short name (used by the batch runner and its CLI)
+MODELS = {
+    "none": NoInhibitorModel,
+    "competitive": CompetitiveModel,
+    "noncompetitive": NonCompetitiveModel,
+    "uncompetitive": UncompetitiveModel,
+    "mixed": MixedModel,
+    "substrate_inhibition": SubstrateInhibitionModel,
+}
+
+def register_model(name, cls=None):
+    """
+    Register a KineticModel subclass under a short name. Works as a plain
+    call or as a class decorator (@register_model("my_model")).
+    """
+    def register(cls):
+        MODELS[name] = cls
+        return cls
+    return register(cls) if cls is not None else register
+
+def get_model(name):
+    """Return a new kinetic model instance for a short name or class name."""
+    if name in MODELS:
+        return MODELS[name]()
+    for cls in MODELS.values():
+        if cls.__name__ == name:
+            return cls()
+    raise ValueError(f"Unknown kinetic model {name!r}; choose from {sorted(MODELS)}")
+
+def model_name(model):
+    """Return the short name of a kinetic model instance."""
+    for name, cls in MODELS.items():
+        if type(model) is cls:
+            return name
+    return type(model).__name__
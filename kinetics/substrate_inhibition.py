@@ -0,0 +1,22 @@
+from kinetics.base_model import KineticModel
+from kinetics.local import local_counts
+
+
+class SubstrateInhibitionModel(KineticModel):
+    """
+    A second substrate binds the ES complex and blocks catalysis:
+    v = Vmax S / (Km + S (1 + S / Ksi)).
+
+    In the spatial engine S is the local substrate count around each
+    complex (local = False uses the global count, as the other engines do).
+    """
+    Ksi = 200
+    local = True
+
+    def catalysis_modifier(self, sim):
+        return 1 / (1 + sim.substrates_remaining / self.Ksi)
+
+    def catalysis_factors(self, sim, enzymes):
+        if not self.local:
+            return self.catalysis_modifier(sim)
+        return 1 / (1 + local_counts(sim, sim.substrate_store, enzymes) / self.Ksi)
@@ -1,9 +1,49 @@
 from .particle import Particle
 
 class Enzyme(Particle):
+    default_radius = 4
+    default_speed = 2.0
+    fields = ("km", "optimal_temp", "optimal_pH")
+
     def __init__(self, x, y, km, optimal_temp, optimal_pH):
-        super().__init__(x, y, radius=4, speed=2.0)
+        super().__init__(x, y)
         self.km = km
         self.optimal_temp = optimal_temp
         self.optimal_pH = optimal_pH
         self.bound = False  # <-- enzyme is free by default
+
+    @property
+    def km(self):
+        return self._store._extra["km"][self._index]
+
+    @km.setter
+    def km(self, value):
+        self._store._extra["km"][self._index] = value
+        self._store.version += 1
+
+    @property
+    def optimal_temp(self):
+        return self._store._extra["optimal_temp"][self._index]
+
+    @optimal_temp.setter
+    def optimal_temp(self, value):
+        self._store._extra["optimal_temp"][self._index] = value
+        self._store.version += 1
+
+    @property
+    def optimal_pH(self):
+        return self._store._extra["optimal_pH"][self._index]
+
+    @optimal_pH.setter
+    def optimal_pH(self, value):
+        self._store._extra["optimal_pH"][self._index] = value
+        self._store.version += 1
+
+    @property
+    def bound(self):
+        # state 1 marks an enzyme that currently holds a substrate (ES complex)
+        return bool(self._store._state[self._index])
+
+    @bound.setter
+    def bound(self, value):
+        self._store._state[self._index] = 1 if value else 0
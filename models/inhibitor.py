@@ -0,0 +1,6 @@
+# models/inhibitor.py
+from .particle import Particle
+
+class Inhibitor(Particle):
+    default_radius = 3
+    default_speed = 3.0
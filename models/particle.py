@@ -1,18 +1,79 @@
 import numpy as np
+from .store import ParticleStore, _default_rng
 
 class Particle:
-    def __init__(self, x, y, radius=5, speed=1.0):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.speed = speed  # base scale of random motion
+    """
+    A single particle. Instances are thin views onto one row of a
+    ParticleStore; a standalone particle owns a one-row store.
+    """
+    default_radius = 5
+    default_speed = 1.0
+    fields = ()
 
-    def move(self, width, height, speed_factor=1.0):
+    def __init__(self, x, y, radius=None, speed=None):
+        radius = self.default_radius if radius is None else radius
+        speed = self.default_speed if speed is None else speed
+        self._store = ParticleStore(radius=radius, speed=speed, fields=self.fields, capacity=1)
+        self._index = 0
+        self._store.add(x, y)
+
+    @classmethod
+    def view(cls, store, index):
+        """Wrap row `index` of `store` without copying any data."""
+        p = cls.__new__(cls)
+        p._store = store
+        p._index = index
+        return p
+
+    @classmethod
+    def make_store(cls, capacity=16):
+        """Create an empty store laid out for this species."""
+        return ParticleStore(
+            radius=cls.default_radius,
+            speed=cls.default_speed,
+            fields=cls.fields,
+            capacity=capacity
+        )
+
+    @property
+    def x(self):
+        return self._store._x[self._index]
+
+    @x.setter
+    def x(self, value):
+        self._store._x[self._index] = value
+
+    @property
+    def y(self):
+        return self._store._y[self._index]
+
+    @y.setter
+    def y(self, value):
+        self._store._y[self._index] = value
+
+    @property
+    def radius(self):
+        return self._store._radius[self._index]
+
+    @radius.setter
+    def radius(self, value):
+        self._store._radius[self._index] = value
+
+    @property
+    def speed(self):
+        return self._store._speed[self._index]
+
+    @speed.setter
+    def speed(self, value):
+        self._store._speed[self._index] = value
+
+    def move(self, width, height, speed_factor=1.0, rng=None):
         """
         Move particle randomly within bounds.
         speed_factor multiplies the base speed (for temperature effects).
         """
-        dx = np.random.uniform(-1, 1) * self.speed * speed_factor
-        dy = np.random.uniform(-1, 1) * self.speed * speed_factor
-        self.x = np.clip(self.x + dx, 0, width)
-        self.y = np.clip(self.y + dy, 0, height)
+        i = self._index
+        store = self._store
+        dx, dy = (rng or _default_rng).uniform(-1, 1, 2) * store._speed[i] * speed_factor
+        store._x[i] = np.clip(store._x[i] + dx, 0, width)
+        store._y[i] = np.clip(store._y[i] + dy, 0, height)
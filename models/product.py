@@ -2,5 +2,6 @@
 from .particle import Particle
 
 class Product(Particle):
-    def __init__(self, x, y):
-        super().__init__(x, y, radius=6, speed=6.0)
+    default_radius = 6
+    default_speed = 6.0
+    fields = ("born",)  # creation time, so the product sink can drop the oldest first
@@ -0,0 +1,163 @@
+# models/store.py
+import numpy as np
+
+_default_rng = np.random.default_rng()  # for stores moved without a simulation Generator
+
+
+def swap_remove(columns, n, indices):
+    """
+    Remove the (unique) `indices` from the first n entries of each column
+    in O(len(indices)): holes below the new end get the surviving entries
+    above it. Returns the new count.
+    """
+    indices = np.asarray(indices)
+    count = n - len(indices)
+    removed_tail = np.zeros(n - count, dtype=bool)
+    removed_tail[indices[indices >= count] - count] = True
+    holes = indices[indices < count]
+    movers = count + np.flatnonzero(~removed_tail)
+    for column in columns:
+        column[holes] = column[movers]
+    return count
+
+
+class ParticleStore:
+    """
+    Contiguous struct-of-arrays storage for one particle species.
+
+    x, y, radius, speed and state are NumPy arrays with one entry per
+    particle; species-specific columns (e.g. enzyme optima) are kept in
+    the same layout and exposed as attributes.
+    """
+
+    def __init__(self, radius=5, speed=1.0, fields=(), capacity=16):
+        self.default_radius = radius
+        self.default_speed = speed
+        self.fields = tuple(fields)
+        self.n = 0
+        self.version = 0  # bumped whenever particles are added, removed or their parameters change
+
+        capacity = max(int(capacity), 1)
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._radius = np.empty(capacity)
+        self._speed = np.empty(capacity)
+        self._state = np.zeros(capacity, dtype=np.int8)
+        self._extra = {name: np.empty(capacity) for name in self.fields}
+
+    # ---------------------------------------------------
+    # Array views over the live particles
+    # ---------------------------------------------------
+    @property
+    def x(self):
+        return self._x[:self.n]
+
+    @property
+    def y(self):
+        return self._y[:self.n]
+
+    @property
+    def radius(self):
+        return self._radius[:self.n]
+
+    @property
+    def speed(self):
+        return self._speed[:self.n]
+
+    @property
+    def state(self):
+        return self._state[:self.n]
+
+    def __getattr__(self, name):
+        extra = self.__dict__.get("_extra", {})
+        if name in extra:
+            return extra[name][:self.n]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return self.n
+
+    # ---------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------
+    def _reserve(self, size):
+        capacity = len(self._x)
+        if size <= capacity:
+            return
+        new_capacity = max(size, 2 * capacity)
+
+        def grow(arr):
+            out = np.empty(new_capacity, dtype=arr.dtype)
+            out[:self.n] = arr[:self.n]
+            return out
+
+        self._x = grow(self._x)
+        self._y = grow(self._y)
+        self._radius = grow(self._radius)
+        self._speed = grow(self._speed)
+        self._state = grow(self._state)
+        self._extra = {name: grow(arr) for name, arr in self._extra.items()}
+
+    def add(self, x, y, **fields):
+        """Append particles at positions x, y (scalars or arrays). Returns their indices."""
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        count = len(x)
+        start, stop = self.n, self.n + count
+        self._reserve(stop)
+
+        self._x[start:stop] = x
+        self._y[start:stop] = y
+        self._radius[start:stop] = fields.pop("radius", self.default_radius)
+        self._speed[start:stop] = fields.pop("speed", self.default_speed)
+        self._state[start:stop] = fields.pop("state", 0)
+        for name in self.fields:
+            self._extra[name][start:stop] = fields.get(name, np.nan)
+
+        self.n = stop
+        self.version += 1
+        return np.arange(start, stop)
+
+    def remove(self, indices):
+        """
+        Remove the particles at the given (unique) indices in O(len(indices)).
+
+        The freed slots are filled with particles from the end of the
+        arrays (swap-remove), so the order of the remaining particles is
+        not kept.
+        """
+        if len(indices) == 0:
+            return
+        columns = (self._x, self._y, self._radius, self._speed, self._state, *self._extra.values())
+        self.n = swap_remove(columns, self.n, indices)
+        self.version += 1
+
+    def clear(self):
+        self.n = 0
+        self.version += 1
+
+    # ---------------------------------------------------
+    # Motion
+    # ---------------------------------------------------
+    def move(self, width, height, speed_factor=1.0, noise=None, rng=None):
+        """
+        Move every particle randomly within bounds in one vectorized pass.
+        speed_factor multiplies the base speed (for temperature effects).
+        noise is an optional pre-drawn (2, n) block of uniform [-1, 1)
+        displacements; otherwise it is drawn from rng.
+        """
+        n = self.n
+        if n == 0:
+            return
+        if noise is None:
+            noise = (rng or _default_rng).uniform(-1, 1, (2, n))
+        step = self.speed * speed_factor
+        x, y = self.x, self.y
+        x += noise[0] * step
+        y += noise[1] * step
+        np.clip(x, 0, width, out=x)
+        np.clip(y, 0, height, out=y)
+
+    def views(self, cls):
+        """Return a list of thin `cls` views, one per live particle."""
+        return [cls.view(self, i) for i in range(self.n)]
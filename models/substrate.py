@@ -2,5 +2,5 @@
 from .particle import Particle
 
 class Substrate(Particle):
-    def __init__(self, x, y):
-        super().__init__(x, y, radius=2, speed=4.0)  # moves faster
+    default_radius = 2
+    default_speed = 4.0  # moves faster
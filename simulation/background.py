@@ -0,0 +1,200 @@
+# simulation/background.py
+"""
+Background simulation runs.
+
+Each run steps its own SimulationState in a separate process, so several
+kinetic models advance side by side on separate cores. Workers stream
+progress through one shared queue; the UI calls BackgroundRuns.poll() to
+drain it and renders from the accumulated RunProgress of every run.
+"""
+
+import multiprocessing as mp
+import queue
+import sys
+import time
+import traceback
+import types
+from contextlib import contextmanager
+
+import numpy as np
+
+from simulation.engine import step_simulation
+from simulation.history import HistoryBuffer
+from simulation.snapshots import species_positions
+from simulation.termination import stop_reason
+
+# Minimum wall time between two progress messages of one worker
+REPORT_SECONDS = 0.2
+
+
+def _new_values(buffer, sent):
+    """Copy of the values appended to a HistoryBuffer since `sent` values were reported."""
+    new = min(buffer.count - sent, len(buffer))
+    return buffer.values[len(buffer) - new:].copy()
+
+
+def _progress(sim, label, run_id, sent, reason):
+    stats = sim.interval_stats
+    return {
+        "label": label,
+        "run_id": run_id,
+        "time": _new_values(sim.time_history, sent),
+        "product": _new_values(sim.product_history, sent),
+        "positions": species_positions(sim) if sim.engine == "spatial" else None,
+        "counts": dict(sim.counts) if sim.counts is not None else None,
+        "stats": (stats.min, stats.mean, stats.std, stats.max) if stats.count else None,
+        "reason": reason,
+        # The finished state goes back to the session (histories, profiler, ensemble input)
+        "sim": sim if reason is not None else None,
+        "error": None,
+    }
+
+
+def _worker(sim, label, run_id, channel, stop, max_steps):
+    """Process entry point: step `sim` to its stop rule, reporting progress on `channel`."""
+    try:
+        sent = 0
+        last = time.perf_counter()
+        channel.put(_progress(sim, label, run_id, sent, None))
+        sent = sim.time_history.count
+
+        reason = None
+        while reason is None:
+            step_simulation(sim)
+            reason = stop_reason(sim, max_steps=max_steps)
+
+            now = time.perf_counter()
+            if reason is None and now - last < REPORT_SECONDS:
+                continue
+            last = now
+            if stop.is_set():
+                return
+            channel.put(_progress(sim, label, run_id, sent, reason))
+            sent = sim.time_history.count
+    except Exception:
+        channel.put({"label": label, "run_id": run_id, "error": traceback.format_exc()})
+
+
+@contextmanager
+def bare_main():
+    """
+    Hide the parent's __main__ while a worker is spawned.
+
+    Streamlit installs the app script as __main__, and spawn would execute
+    it again in every worker; workers only need the importable modules.
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+class RunProgress:
+    """Everything the UI knows about one background run so far."""
+
+    def __init__(self, label, run_id, width, height, engine="spatial"):
+        self.label = label
+        self.run_id = run_id
+        self.width = width
+        self.height = height
+        self.engine = engine
+        self.time = HistoryBuffer(np.int64)
+        self.product = HistoryBuffer(np.int64)
+        self.positions = None
+        self.counts = None
+        self.stats = None
+        self.reason = None
+        self.error = None
+        self.sim = None
+        self.done = False
+
+    def update(self, message):
+        if message["error"] is not None:
+            self.error = message["error"]
+            self.done = True
+            return
+        self.time.extend(message["time"])
+        self.product.extend(message["product"])
+        self.positions = message["positions"]
+        self.counts = message["counts"]
+        self.stats = message["stats"]
+        if message["reason"] is not None:
+            self.reason = message["reason"]
+            self.sim = message["sim"]
+            self.done = True
+
+
+class BackgroundRuns:
+    """
+    One background process per label (e.g. per kinetic-model tab).
+
+    start(label, sim) ships a configured SimulationState to a new process
+    (replacing any earlier run of that label); poll() applies all queued
+    progress messages and returns the number applied.
+    """
+
+    def __init__(self, max_steps=None):
+        self.max_steps = max_steps
+        self._ctx = mp.get_context("spawn")
+        self.channel = self._ctx.Queue()
+        self.runs = {}
+        self._processes = {}
+        self._run_ids = 0
+
+    def start(self, label, sim):
+        self.stop(label)
+        self._run_ids += 1
+        stop = self._ctx.Event()
+        process = self._ctx.Process(
+            target=_worker,
+            args=(sim, label, self._run_ids, self.channel, stop, self.max_steps),
+            daemon=True,
+        )
+        with bare_main():
+            process.start()
+        self._processes[label] = (process, stop)
+        self.runs[label] = RunProgress(label, self._run_ids, sim.width, sim.height, sim.engine)
+        return self.runs[label]
+
+    def stop(self, label):
+        """Ask the run of `label` to stop and forget it."""
+        entry = self._processes.pop(label, None)
+        if entry is not None:
+            entry[1].set()
+        self.runs.pop(label, None)
+
+    def shutdown(self):
+        for label in list(self._processes):
+            self.stop(label)
+
+    def running(self, label=None):
+        if label is not None:
+            return label in self.runs and not self.runs[label].done
+        return any(not run.done for run in self.runs.values())
+
+    def poll(self):
+        applied = 0
+        while True:
+            try:
+                message = self.channel.get_nowait()
+            except queue.Empty:
+                break
+            message.setdefault("error", None)
+            run = self.runs.get(message["label"])
+            # Messages from a replaced run are dropped
+            if run is None or run.run_id != message["run_id"]:
+                continue
+            run.update(message)
+            applied += 1
+
+        # A worker that died without reporting its end
+        for label, (process, _) in list(self._processes.items()):
+            run = self.runs[label]
+            if run.done:
+                self._processes.pop(label)
+            elif not process.is_alive() and process.exitcode not in (0, None) and self.channel.empty():
+                run.error = f"Worker exited with code {process.exitcode}"
+                run.done = True
+        return applied
@@ -0,0 +1,175 @@
+# simulation/batch.py
+"""
+Headless batch runner: parameter sweeps over a process pool.
+
+Python API:
+    from simulation.batch import sweep
+    df = sweep(substrate_count=[50, 100, 200], model=["none", "competitive"], workers=4)
+
+CLI:
+    python -m simulation.batch --substrate-count 50 100 200 --model none competitive --out runs.csv
+"""
+
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from simulation.state import SimulationState
+from simulation.engine import run_until_stop
+from simulation.termination import MAX_STEPS
+from kinetics.registry import MODELS, get_model
+
+# --- Sweepable parameters and their defaults (same as the UI defaults) ---
+PARAMETERS = {
+    "model": "none",
+    "substrate_count": 100,
+    "enzyme_count": 10,
+    "inhibitor_count": 0,
+    "explicit_inhibitors": False,
+    "temperature": 37,
+    "pH": 7.0,
+    "engine": "spatial",
+}
+
+
+def make_simulation(params, seed=None):
+    """Build a SimulationState configured from a parameter dict."""
+    params = {**PARAMETERS, **params}
+    sim = SimulationState(get_model(params["model"]), seed=seed)
+    sim.update_environment({"temperature": params["temperature"], "pH": params["pH"]})
+    sim.enzyme_count = int(params["enzyme_count"])
+    sim.substrate_count = int(params["substrate_count"])
+    sim.inhibitor_count = int(params["inhibitor_count"]) if sim.kinetic_model.uses_inhibitor else 0
+    sim.explicit_inhibitors = bool(params["explicit_inhibitors"])
+    sim.engine = params["engine"]
+    sim.product_sink = 0  # nothing is drawn headless: products are only counted
+    sim.initialize_particles()
+    return sim
+
+
+def run_simulation(params, seed=None, max_steps=MAX_STEPS):
+    """
+    Run one simulation to the plateau / substrate-exhaustion stop rules.
+
+    Returns a tidy DataFrame with one row per sampled time point, carrying
+    the run parameters, seed and stop reason in every row.
+    """
+    params = {**PARAMETERS, **params}
+    sim = make_simulation(params, seed=seed)
+    reason, _ = run_until_stop(sim, max_steps=max_steps)
+
+    df = pd.DataFrame({
+        "time": sim.history_time_sampled.values,
+        "product": sim.history_product_sampled.values,
+    })
+    for name, value in params.items():
+        df[name] = value
+    df["seed"] = sim.seed
+    df["steps"] = sim.time
+    df["final_product"] = sim.product_total
+    df["stop_reason"] = reason
+    return df
+
+
+def _run_task(run_id, params, seed, max_steps):
+    df = run_simulation(params, seed=seed, max_steps=max_steps)
+    df.insert(0, "run", run_id)
+    return df
+
+
+def parameter_grid(**values):
+    """Expand lists of parameter values into a list of parameter dicts (full factorial)."""
+    unknown = set(values) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    axes = {}
+    for name, default in PARAMETERS.items():
+        value = values.get(name, default)
+        axes[name] = list(value) if isinstance(value, (list, tuple, np.ndarray)) else [value]
+    names = list(axes)
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes.values())]
+
+
+def iter_sweep(grid, seed=None, workers=None, max_steps=MAX_STEPS):
+    """
+    Run every parameter set in `grid` across a process pool and yield one
+    tidy DataFrame per run as soon as it finishes (completion order).
+
+    Each run gets an independent seed spawned from `seed`, so a sweep is
+    reproducible regardless of worker count or scheduling.
+    """
+    children = np.random.SeedSequence(seed).spawn(len(grid))
+    seeds = [int(child.generate_state(1)[0]) for child in children]
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_task, run_id, params, run_seed, max_steps)
+            for run_id, (params, run_seed) in enumerate(zip(grid, seeds))
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sweep(seed=None, workers=None, max_steps=MAX_STEPS, **values):
+    """Run a full-factorial sweep and return one tidy DataFrame sorted by run and time."""
+    grid = parameter_grid(**values)
+    frames = list(iter_sweep(grid, seed=seed, workers=workers, max_steps=max_steps))
+    return pd.concat(frames, ignore_index=True).sort_values(["run", "time"], ignore_index=True)
+
+
+# ---------------------------------------------------
+# CLI
+# ---------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run headless enzyme kinetics parameter sweeps."
+    )
+    parser.add_argument("--model", nargs="+", default=[PARAMETERS["model"]], choices=sorted(MODELS))
+    parser.add_argument("--substrate-count", nargs="+", type=int, default=[PARAMETERS["substrate_count"]])
+    parser.add_argument("--enzyme-count", nargs="+", type=int, default=[PARAMETERS["enzyme_count"]])
+    parser.add_argument("--inhibitor-count", nargs="+", type=int, default=[PARAMETERS["inhibitor_count"]])
+    parser.add_argument("--explicit-inhibitors", nargs="+", type=int, choices=[0, 1],
+                        default=[int(PARAMETERS["explicit_inhibitors"])],
+                        help="1 = inhibitors as particles acting locally (spatial engine)")
+    parser.add_argument("--temperature", nargs="+", type=float, default=[PARAMETERS["temperature"]])
+    parser.add_argument("--pH", "--ph", dest="pH", nargs="+", type=float, default=[PARAMETERS["pH"]])
+    parser.add_argument("--engine", nargs="+", default=[PARAMETERS["engine"]], choices=["spatial", "well_mixed", "mean_field"])
+    parser.add_argument("--seed", type=int, default=None, help="root seed for the whole sweep")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--out", default="-", help="CSV output path ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    grid = parameter_grid(
+        model=args.model,
+        substrate_count=args.substrate_count,
+        enzyme_count=args.enzyme_count,
+        inhibitor_count=args.inhibitor_count,
+        explicit_inhibitors=args.explicit_inhibitors,
+        temperature=args.temperature,
+        pH=args.pH,
+        engine=args.engine,
+    )
+
+    # Stream rows out as runs complete
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    try:
+        header = True
+        for df in iter_sweep(grid, seed=args.seed, workers=args.workers, max_steps=args.max_steps):
+            df.to_csv(out, index=False, header=header)
+            out.flush()
+            header = False
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
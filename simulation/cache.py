@@ -0,0 +1,222 @@
+# simulation/cache.py
+"""
+Process-wide cache of finished runs.
+
+A run is fully determined by the kinetic model, the SimulationState
+parameters, its starting state (particles, counts and the position of the
+random streams) and the stop rules, so identical requests (e.g. a class
+running the default configuration from the same seed) are computed once
+and then served from the cache. Entries are pickled (a hit always
+returns a private copy), evicted least-recently-used by count and total
+size, and optionally persisted to a directory shared by server processes.
+
+    sim, reason, snapshots, hit = run_cached(sim, snapshot_stride=2)
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from simulation.engine import run_until_stop
+
+# Bump when a change to the engine alters trajectories, so stale entries are never served
+CACHE_VERSION = 2
+
+# SimulationState attributes that determine a run (besides the model and the environment)
+STATE_PARAMETERS = (
+    "seed", "engine", "enzyme_count", "substrate_count", "inhibitor_count", "explicit_inhibitors",
+    "width", "height", "sample_interval", "history_cap", "base_speed",
+    "default_km", "default_optimal_temp", "default_optimal_pH", "product_sink",
+)
+
+
+# Particle stores whose starting arrays are part of the key
+STORES = ("enzyme_store", "substrate_store", "product_store", "inhibitor_store")
+
+
+def _start_digest(sim):
+    """
+    Hash of the starting state: the particle arrays and the unread part of
+    the random block. Two states with the same seed can still differ here
+    (e.g. initialize_particles() drew from the stream after construction).
+    """
+    digest = hashlib.sha256()
+    for name in STORES:
+        store = getattr(sim, name)
+        for column in ("x", "y", "radius", "speed", "state") + tuple(store.fields):
+            digest.update(np.ascontiguousarray(getattr(store, column)).tobytes())
+    random = sim.random
+    digest.update(np.ascontiguousarray(random._block[random._pos:]).tobytes())
+    return digest.hexdigest()
+
+
+def run_key(sim, **run_args):
+    """Hash of everything that determines the run of `sim` with `run_args`."""
+    model = sim.kinetic_model
+    description = {
+        "version": CACHE_VERSION,
+        "model": f"{type(model).__module__}.{type(model).__qualname__}",
+        "model_parameters": vars(model),
+        "environment": sim.environment,
+        "state": {name: getattr(sim, name) for name in STATE_PARAMETERS},
+        "start": {
+            "counts": sim.counts,
+            "products_sunk": sim.products_sunk,
+            "rng": sim.rng.bit_generator.state,
+            "particles": _start_digest(sim),
+        },
+        "run": run_args,
+    }
+    encoded = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class RunCache:
+    """
+    Thread-safe LRU cache of pickled run results.
+
+    Keeps at most `max_entries` entries and `max_bytes` pickled bytes in
+    memory. With `directory` set, entries are also written there and read
+    back on a memory miss; the directory is trimmed to `max_disk_bytes`
+    (least recently used first).
+    """
+
+    def __init__(self, max_entries=256, max_bytes=256 * 2**20, directory=None, max_disk_bytes=2 * 2**30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Return a fresh copy of the cached value, or None."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            elif self.directory and os.path.exists(self._path(key)):
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._path(key))
+                self._store(key, data)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(data)
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, data)
+            if self.directory:
+                tmp = self._path(key) + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, self._path(key))
+                self._trim_disk()
+
+    def _store(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = data
+        self._size += len(data)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _trim_disk(self):
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory) if name.endswith(".pkl")
+        ]
+        stats = sorted(((os.stat(path), path) for path in files), key=lambda item: item[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in stats)
+        for stat, path in stats:
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= stat.st_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """
+    The process-wide RunCache (created on first use). The environment
+    variables ENZYMULATOR_CACHE_DIR and ENZYMULATOR_CACHE_MB enable disk
+    persistence and set the memory budget.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = RunCache(
+                max_bytes=int(os.environ.get("ENZYMULATOR_CACHE_MB", 256)) * 2**20,
+                directory=os.environ.get("ENZYMULATOR_CACHE_DIR") or None,
+            )
+    return _shared_cache
+
+
+def run_cached(sim, cache=None, max_steps=None, snapshot_stride=None, **rules):
+    """
+    run_until_stop through the cache.
+
+    Returns (sim, reason, snapshots, hit). On a hit `sim` is the cached
+    finished state (a copy owned by the caller) and no step is computed;
+    on a miss the given sim is run and the result stored. Only runs that
+    start from a freshly reset state (time 0) are cached.
+    """
+    if sim.time != 0:
+        reason, snapshots = run_until_stop(sim, max_steps=max_steps, snapshot_stride=snapshot_stride, **rules)
+        return sim, reason, snapshots, False
+
+    cache = shared_cache() if cache is None else cache
+    key = run_key(sim, max_steps=max_steps, snapshot_stride=snapshot_stride, **rules)
+
+    cached = cache.get(key)
+    if cached is not None:
+        cached_sim, reason, snapshots = cached
+        cached_sim.profiler = sim.profiler
+        return cached_sim, reason, snapshots, True
+
+    reason, snapshots = run_until_stop(sim, max_steps=max_steps, snapshot_stride=snapshot_stride, **rules)
+
+    # Session-specific attachments are not part of the result
+    profiler, recorder = sim.profiler, sim.recorder
+    sim.profiler = sim.recorder = None
+    try:
+        cache.put(key, (sim, reason, snapshots))
+    finally:
+        sim.profiler, sim.recorder = profiler, recorder
+    return sim, reason, snapshots, False
@@ -0,0 +1,390 @@
+# simulation/checkpoint.py
+"""
+Binary checkpoints and copy-on-write forks of a SimulationState.
+
+A checkpoint is one file: a magic tag, a JSON header (parameters,
+counters, environment, model, RNG state) and the raw arrays (particle
+stores, histories, the current RandomBuffer block), each aligned to a
+page. Arrays are stored with their allocated capacity, but only the
+used part is written; the rest is left as a hole, so the file stays
+compact on disk while a loaded buffer can keep growing in place.
+
+load_checkpoint(path, mmap=True) maps the arrays copy-on-write: loading
+is instant, pages are read on first access, and a state only pays memory
+for the pages it modifies. fork() uses that to branch one state into many
+without re-simulating:
+
+    save_checkpoint(sim, "equilibrated.ckpt")
+    sim = load_checkpoint("equilibrated.ckpt")
+    for branch, inhibitors in zip(fork(sim, branches=3), (0, 20, 40)):
+        branch.inhibitor_count = inhibitors
+"""
+
+import copy
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from kinetics.registry import get_model, model_name
+from simulation.engine import ENGINES
+from simulation.history import HistoryBuffer, RunningStats
+from simulation.meanfield import SPECIES
+from simulation.rng import RandomBuffer
+from simulation.state import SimulationState
+
+MAGIC = b"ENZCKPT1"
+ALIGN = 4096
+
+STORES = ("enzyme_store", "substrate_store", "product_store", "inhibitor_store")
+STORE_COLUMNS = ("_x", "_y", "_radius", "_speed", "_state")
+HISTORIES = (
+    "time_history", "product_history", "rate_history",
+    "history_time_sampled", "history_product_sampled",
+)
+SCALARS = (
+    "enzyme_count", "substrate_count", "inhibitor_count", "explicit_inhibitors",
+    "width", "height", "time", "step_counter", "sample_interval",
+    "product_sink", "products_sunk", "history_cap",
+    "default_km", "default_optimal_temp", "default_optimal_pH",
+    "base_speed", "engine", "counts", "environment",
+)
+
+
+def _plain(value):
+    """NumPy scalars to Python ones, so the header is plain JSON."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# ---------------------------------------------------
+# Save
+# ---------------------------------------------------
+def _collect(sim):
+    """Return (header, {name: (array, used length)}) for `sim`."""
+    arrays = {}
+    stores = {}
+    for name in STORES:
+        store = getattr(sim, name)
+        stores[name] = {
+            "n": store.n,
+            "default_radius": store.default_radius,
+            "default_speed": store.default_speed,
+            "fields": list(store.fields),
+        }
+        for column in STORE_COLUMNS:
+            arrays[f"{name}.{column}"] = (getattr(store, column), store.n)
+        for field, arr in store._extra.items():
+            arrays[f"{name}.{field}"] = (arr, store.n)
+
+    histories = {}
+    for name in HISTORIES:
+        buffer = getattr(sim, name)
+        histories[name] = {"count": buffer.count, "maxlen": buffer.maxlen}
+        used = buffer.count if buffer.maxlen is None else len(buffer._buf)
+        arrays[f"history.{name}"] = (buffer._buf, used)
+
+    random = sim.random
+    arrays["random.block"] = (random._block, len(random._block))
+    stats = sim.interval_stats
+    seed_sequence = sim._seed_sequence
+
+    header = {
+        "model": model_name(sim.kinetic_model),
+        "model_parameters": {key: _plain(value) for key, value in vars(sim.kinetic_model).items()},
+        "seed": sim.seed,
+        "state": {name: _plain(getattr(sim, name)) for name in SCALARS},
+        "stores": stores,
+        "histories": histories,
+        "interval_stats": {
+            "count": stats.count, "mean": stats.mean, "m2": stats._m2,
+            "min": _plain(stats.min), "max": _plain(stats.max),
+        },
+        "rng": sim.rng.bit_generator.state,
+        "seed_sequence": {
+            "entropy": seed_sequence.entropy,
+            "spawn_key": list(seed_sequence.spawn_key),
+            "n_children_spawned": seed_sequence.n_children_spawned,
+        },
+        "random": {"pos": random._pos, "block_size": random.block_size},
+    }
+    return header, arrays
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def save_checkpoint(sim, target):
+    """
+    Write a checkpoint of `sim` to a path or binary file object.
+    The attached profiler and recorder are not part of the checkpoint.
+    """
+    header, arrays = _collect(sim)
+    layout = {}
+    blobs = []
+    for name, (arr, used) in arrays.items():
+        layout[name] = {"dtype": arr.dtype.str, "length": len(arr), "used": int(used)}
+        blobs.append((name, arr))
+
+    # Offsets depend on the header length, which depends on the offsets: reserve room generously
+    def encode(offset):
+        for name, arr in blobs:
+            offset = _aligned(offset)
+            layout[name]["offset"] = offset
+            offset += arr.nbytes
+        header["arrays"] = layout
+        return json.dumps(header).encode(), offset
+
+    encoded, _ = encode(0)
+    start = _aligned(len(MAGIC) + 8 + len(encoded) + 1024)
+    encoded, end = encode(start)
+    encoded = encoded.ljust(start - len(MAGIC) - 8)
+
+    f = open(target, "wb") if isinstance(target, (str, os.PathLike)) else target
+    try:
+        f.write(MAGIC)
+        f.write(np.uint64(len(encoded)).tobytes())
+        f.write(encoded)
+        for name, arr in blobs:
+            entry = layout[name]
+            f.seek(entry["offset"])
+            f.write(np.ascontiguousarray(arr[:entry["used"]]).tobytes())
+        # Unused capacity stays a hole; make the file reach the end of the last array
+        # (even when that array is empty and nothing was written at its offset)
+        f.seek(0, os.SEEK_END)
+        if f.tell() < end:
+            f.seek(end - 1)
+            f.write(b"\0")
+    finally:
+        if f is not target:
+            f.close()
+
+
+# ---------------------------------------------------
+# Load
+# ---------------------------------------------------
+def _read_header(buffer):
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a simulation checkpoint")
+    size = int(np.frombuffer(bytes(buffer[len(MAGIC):len(MAGIC) + 8]), dtype=np.uint64)[0])
+    start = len(MAGIC) + 8
+    return json.loads(bytes(buffer[start:start + size]))
+
+
+def _number(value, low=0.0):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and low <= value < np.inf
+
+
+def _count(value, low=0):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= low
+
+
+# state key -> test its value must pass
+_SCALAR_CHECKS = {
+    "enzyme_count": _count,
+    "substrate_count": _count,
+    "inhibitor_count": _count,
+    "explicit_inhibitors": lambda v: isinstance(v, bool),
+    "width": lambda v: _number(v) and v > 0,
+    "height": lambda v: _number(v) and v > 0,
+    "time": _count,
+    "step_counter": _count,
+    "sample_interval": lambda v: _count(v, 1),
+    "product_sink": lambda v: v is None or _count(v),
+    "products_sunk": _count,
+    "history_cap": lambda v: v is None or _count(v, 1),
+    "default_km": _number,
+    "default_optimal_temp": lambda v: _number(v, -np.inf),
+    "default_optimal_pH": _number,
+    "base_speed": _number,
+    "engine": lambda v: v == "spatial" or v in ENGINES,
+    "counts": lambda v: v is None or (isinstance(v, dict) and set(v) == set(SPECIES)
+                                      and all(_number(x) for x in v.values())),
+    "environment": lambda v: (isinstance(v, dict) and set(v) == {"temperature", "pH"}
+                              and _number(v["temperature"], -np.inf) and _number(v["pH"])),
+}
+
+
+def _validate(header, size):
+    """
+    Reject anything a well-formed checkpoint of `size` bytes cannot hold:
+    unknown state, store or history keys, state values of the wrong type
+    or range, and array entries or counts that point outside the data.
+    Uploaded files are untrusted.
+    """
+    def check(condition, message):
+        if not condition:
+            raise ValueError(f"Corrupt checkpoint: {message}")
+
+    try:
+        unknown = set(header["state"]) - set(SCALARS)
+        check(not unknown, f"unknown state keys {sorted(unknown)}")
+        for name, value in header["state"].items():
+            check(_SCALAR_CHECKS[name](value), f"invalid {name} {value!r}")
+        check(set(header["stores"]) <= set(STORES), "unknown particle stores")
+        check(set(header["histories"]) <= set(HISTORIES), "unknown histories")
+
+        layout = header["arrays"]
+        for name, entry in layout.items():
+            dtype = np.dtype(entry["dtype"])
+            check(dtype.kind in "biuf", f"{name} has dtype {dtype}")
+            length, used, offset = entry["length"], entry["used"], entry["offset"]
+            check(all(isinstance(v, int) for v in (length, used, offset)), f"{name} layout")
+            check(0 <= used <= length, f"{name} uses {used} of {length} entries")
+            # The whole capacity is mapped (or allocated), not only the used part
+            check(length == 0 or 0 <= offset <= size - length * dtype.itemsize, f"{name} lies outside the file")
+
+        for name, info in header["stores"].items():
+            check(isinstance(info["n"], int), f"{name} particle count")
+            for column in list(STORE_COLUMNS) + list(info["fields"]):
+                entry = layout[f"{name}.{column}"]
+                check(0 <= info["n"] <= entry["used"], f"{name} holds more particles than stored")
+                check(entry["length"] == layout[f"{name}._x"]["length"], f"{name} columns differ in capacity")
+
+        for name, info in header["histories"].items():
+            entry = layout[f"history.{name}"]
+            maxlen = info["maxlen"]
+            check(isinstance(info["count"], int) and isinstance(maxlen, (int, type(None))), f"{name} counts")
+            if maxlen is None:
+                check(0 <= info["count"] <= entry["used"], f"{name} holds more values than stored")
+            else:
+                check(maxlen > 0 and entry["length"] == entry["used"] == 2 * maxlen, f"{name} ring size")
+                check(info["count"] >= 0, f"{name} count")
+
+        random = header["random"]
+        check(isinstance(random["pos"], int) and isinstance(random["block_size"], int), "random state")
+        check(random["block_size"] > 0, "random block size")
+        check(0 <= random["pos"] <= layout["random.block"]["used"], "random block position")
+    except (KeyError, TypeError) as exc:
+        raise ValueError(f"Corrupt checkpoint: malformed header ({exc!r})") from None
+
+
+def load_checkpoint(source, model=None, mmap=True):
+    """
+    Rebuild a SimulationState from a checkpoint path or its bytes.
+
+    With a path and mmap=True the arrays are copy-on-write memory maps of
+    the file; otherwise they are read into memory. `model` overrides the
+    kinetic model named in the checkpoint (e.g. an unregistered class).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            head = f.read(len(MAGIC) + 8)
+            size = int(np.frombuffer(head[len(MAGIC):], dtype=np.uint64)[0])
+            header = _read_header(head + f.read(size))
+        file_size = os.path.getsize(source)
+        def read(entry):
+            if mmap:
+                return np.memmap(source, dtype=entry["dtype"], mode="c",
+                                 offset=entry["offset"], shape=(entry["length"],))
+            out = np.zeros(entry["length"], dtype=entry["dtype"])
+            out[:entry["used"]] = np.fromfile(source, dtype=entry["dtype"],
+                                              count=entry["used"], offset=entry["offset"])
+            return out
+    else:
+        data = memoryview(source)
+        header = _read_header(data)
+        file_size = data.nbytes
+
+        def read(entry):
+            out = np.zeros(entry["length"], dtype=entry["dtype"])
+            out[:entry["used"]] = np.frombuffer(data, dtype=entry["dtype"],
+                                                count=entry["used"], offset=entry["offset"])
+            return out
+
+    def array(entry):
+        # An empty array has nothing to map (np.memmap rejects length 0)
+        if entry["length"] == 0:
+            return np.empty(0, dtype=entry["dtype"])
+        return read(entry)
+
+    _validate(header, file_size)
+    if model is None:
+        model = get_model(header["model"])
+        for key, value in header["model_parameters"].items():
+            # Only the model's own (non-method) parameters
+            if key.startswith("_") or not hasattr(model, key) or callable(getattr(model, key)):
+                raise ValueError(f"Corrupt checkpoint: unknown model parameter {key!r}")
+            setattr(model, key, value)
+
+    sim = SimulationState(model, seed=header["seed"])
+    for name, value in header["state"].items():
+        setattr(sim, name, value)
+    layout = header["arrays"]
+
+    # --- Particles ---
+    for name, info in header["stores"].items():
+        store = getattr(sim, name)
+        if not set(info["fields"]) <= set(store.fields):
+            raise ValueError(f"Corrupt checkpoint: unknown fields in {name}")
+        store.default_radius = info["default_radius"]
+        store.default_speed = info["default_speed"]
+        for column in STORE_COLUMNS:
+            setattr(store, column, array(layout[f"{name}.{column}"]))
+        store._extra = {field: array(layout[f"{name}.{field}"]) for field in info["fields"]}
+        store.n = info["n"]
+        store.version += 1
+
+    # --- Histories ---
+    for name, info in header["histories"].items():
+        buffer = HistoryBuffer(np.int64, maxlen=info["maxlen"])
+        buffer._buf = array(layout[f"history.{name}"])
+        buffer.dtype = buffer._buf.dtype
+        buffer.count = info["count"]
+        setattr(sim, name, buffer)
+
+    stats = RunningStats()
+    info = header["interval_stats"]
+    stats.count, stats.mean, stats._m2 = info["count"], info["mean"], info["m2"]
+    stats.min, stats.max = info["min"], info["max"]
+    sim.interval_stats = stats
+
+    # --- Random streams: continue exactly where the saved run stopped ---
+    info = header["seed_sequence"]
+    sim._seed_sequence = np.random.SeedSequence(
+        info["entropy"], spawn_key=tuple(info["spawn_key"]),
+        n_children_spawned=info["n_children_spawned"]
+    )
+    sim.rng.bit_generator.state = header["rng"]
+    sim.random = RandomBuffer(sim.rng, block_size=header["random"]["block_size"])
+    sim.random._block = np.array(array(layout["random.block"]))
+    sim.random._pos = header["random"]["pos"]
+    return sim
+
+
+def checkpoint_bytes(sim):
+    """The checkpoint of `sim` as bytes (e.g. for a download button)."""
+    buffer = io.BytesIO()
+    save_checkpoint(sim, buffer)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------
+# Fork
+# ---------------------------------------------------
+def fork(sim, branches=1, reseed=False, directory=None):
+    """
+    Branch `sim` into `branches` independent states without re-simulating.
+
+    The branches map one temporary checkpoint copy-on-write, so arrays a
+    branch does not modify (e.g. the history prefix) are shared between
+    all of them. By default every branch continues the parent's random
+    stream (common random numbers for what-if comparisons); reseed=True
+    gives each branch its own child stream instead.
+    """
+    fd, path = tempfile.mkstemp(suffix=".ckpt", dir=directory)
+    os.close(fd)
+    try:
+        save_checkpoint(sim, path)
+        out = [load_checkpoint(path, model=copy.copy(sim.kinetic_model)) for _ in range(branches)]
+    finally:
+        os.remove(path)  # the mappings keep the data alive
+
+    if reseed:
+        for branch, child in zip(out, sim._seed_sequence.spawn(branches)):
+            branch._seed_sequence = child
+            branch.rng = np.random.default_rng(child)
+            branch.random = RandomBuffer(branch.rng, block_size=sim.random.block_size)
+    return out
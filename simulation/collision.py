@@ -3,3 +3,114 @@ import numpy as np
 def check_collision(p1, p2):
     dist = np.sqrt((p1.x - p2.x)**2 + (p1.y - p2.y)**2)
     return dist < (p1.radius + p2.radius)
+
+
+class CellList:
+    """
+    Uniform-grid neighbor index over a width x height box.
+
+    Points are bucketed into square cells of side `cell_size` (at least the
+    largest contact distance), so every point within `cell_size` of a query
+    lies in the query's cell or one of its 8 neighbors.
+    """
+
+    def __init__(self, x, y, cell_size, width, height):
+        self.cell_size = float(cell_size)
+        self.nx = max(int(np.ceil(width / self.cell_size)), 1)
+        self.ny = max(int(np.ceil(height / self.cell_size)), 1)
+
+        cells = self._cell_ids(x, y)
+        self.order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=self.nx * self.ny)
+        self.starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self.counts = counts
+
+    def _cells(self, x, y):
+        cx = np.minimum((np.asarray(x) / self.cell_size).astype(np.int64), self.nx - 1)
+        cy = np.minimum((np.asarray(y) / self.cell_size).astype(np.int64), self.ny - 1)
+        return np.maximum(cx, 0), np.maximum(cy, 0)
+
+    def _cell_ids(self, x, y):
+        cx, cy = self._cells(x, y)
+        return cy * self.nx + cx
+
+    def query(self, qx, qy):
+        """
+        Return candidate pairs (query index, point index) for all points in
+        the 3x3 block of cells around each query point.
+        """
+        cx, cy = self._cells(qx, qy)
+        q = np.arange(len(cx))
+
+        qi, start, count = [], [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = cx + dx, cy + dy
+                ok = (nx >= 0) & (nx < self.nx) & (ny >= 0) & (ny < self.ny)
+                cell = ny[ok] * self.nx + nx[ok]
+                qi.append(q[ok])
+                start.append(self.starts[cell])
+                count.append(self.counts[cell])
+
+        qi = np.concatenate(qi)
+        start = np.concatenate(start)
+        count = np.concatenate(count)
+
+        # Expand each (start, count) range into individual point indices
+        total = int(count.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        offsets = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        pj = self.order[np.repeat(start, count) + offsets]
+        return np.repeat(qi, count), pj
+
+
+def find_contacts(ax, ay, ar, bx, by, br, width, height, profiler=None):
+    """
+    Return index arrays (i, j) of every pair with
+    dist(a_i, b_j) < ar_i + br_j, using a cell list over the b points.
+    With a profiler, the number of candidate distance checks is counted.
+    """
+    if len(ax) == 0 or len(bx) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    cell_size = np.max(ar) + np.max(br)
+    grid = CellList(bx, by, cell_size, width, height)
+    i, j = grid.query(ax, ay)
+    if profiler is not None:
+        profiler.count("collision_checks", len(i))
+
+    dist2 = (ax[i] - bx[j]) ** 2 + (ay[i] - by[j]) ** 2
+    hit = dist2 < (ar[i] + br[j]) ** 2
+    return i[hit], j[hit]
+
+
+def resolve_pairs(i, j, priority):
+    """
+    Pick a one-to-one matching from candidate pairs (i, j).
+
+    Pairs are taken in increasing `priority`; a pair is dropped once its
+    i or its j has been matched. Returns the matched (i, j) arrays.
+    """
+    order = np.argsort(priority, kind="stable")
+    i, j = i[order], j[order]
+
+    matched_i, matched_j = [], []
+    while len(i):
+        # Best pair per i, then best of those per j (keeping priority order)
+        _, first_i = np.unique(i, return_index=True)
+        first_i.sort()
+        _, first_j = np.unique(j[first_i], return_index=True)
+        win = first_i[np.sort(first_j)]
+
+        matched_i.append(i[win])
+        matched_j.append(j[win])
+
+        keep = ~np.isin(i, i[win]) & ~np.isin(j, j[win])
+        i, j = i[keep], j[keep]
+
+    if not matched_i:
+        return i, j
+    return np.concatenate(matched_i), np.concatenate(matched_j)
@@ -0,0 +1,494 @@
+# simulation/domain.py
+"""
+Domain-decomposed multi-core stepping for large boxes.
+
+The width x height box is split into nx x ny tiles, each owned by one
+worker process. Particle arrays live in shared memory, one fixed-capacity
+row per tile, and every step runs in lock-step phases separated by a
+barrier:
+
+    1. move       workers move their own particles; particles that left the
+                  tile are written to the tile's outbox
+    2. migrate    workers take in the particles addressed to them by their
+                  neighbors and export their substrates within contact
+                  distance of the tile edge (the halo)
+    3. bind       workers find contacts between their free enzymes and their
+                  own plus the neighbors' halo substrates, and draw binds
+    4. resolve    the parent matches the accepted pairs of all tiles at once
+                  (a halo substrate can be claimed from two tiles), binds the
+                  winners and removes their substrates
+    5. catalysis  workers release products from their ES complexes
+
+Products are only counted (as with sim.product_sink = 0). Time, histories
+and stop rules stay on the template SimulationState; sync() writes the
+particles back into its stores.
+
+    with TiledSimulation(sim, tiles=(4, 2)) as tiled:
+        reason = tiled.run()
+"""
+
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from models.enzyme import Enzyme
+from models.store import swap_remove
+from models.substrate import Substrate
+from simulation.background import bare_main
+from simulation.collision import find_contacts, resolve_pairs
+from simulation.termination import MAX_STEPS, PLATEAU_THRESHOLD, PLATEAU_INTERVALS, stop_reason
+from kinetics.base_model import Conditions
+from kinetics.rates import BIND_PROBABILITY, CATALYSIS_PROBABILITY
+
+# --- Control slots, written by the parent before every step ---
+SPEED, BIND_MOD, CAT_MOD, COMMAND = range(4)
+STEP, EXIT = 0, 1
+
+
+class SharedArrays:
+    """
+    Named NumPy arrays in one shared-memory block.
+
+    Pickles as its layout plus the block name, so a worker process
+    attaches to the same memory instead of receiving a copy.
+    """
+
+    def __init__(self, layout, name=None):
+        self.layout = layout
+        offsets, size = {}, 0
+        for key, (shape, dtype) in layout.items():
+            size = -(-size // 8) * 8  # 8-byte alignment
+            offsets[key] = size
+            size += int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.arrays = {
+            key: np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offsets[key])
+            for key, (shape, dtype) in layout.items()
+        }
+        if self._owner:
+            for arr in self.arrays.values():
+                arr.fill(0)
+
+    def __getattr__(self, key):
+        arrays = self.__dict__.get("arrays", {})
+        if key in arrays:
+            return arrays[key]
+        raise AttributeError(key)
+
+    def __getstate__(self):
+        return {"layout": self.layout, "name": self.shm.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["layout"], state["name"])
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _tile_ids(x, y, geometry):
+    cx = np.minimum((x / geometry["tile_w"]).astype(np.int64), geometry["nx"] - 1)
+    cy = np.minimum((y / geometry["tile_h"]).astype(np.int64), geometry["ny"] - 1)
+    return cy * geometry["nx"] + cx
+
+
+def tile_grid(tiles, width, height):
+    """Split `tiles` into an (nx, ny) grid whose cells are as square as possible."""
+    best = None
+    for nx in range(1, tiles + 1):
+        if tiles % nx:
+            continue
+        ny = tiles // nx
+        badness = abs(np.log((width / nx) / (height / ny)))
+        if best is None or badness < best[0]:
+            best = (badness, nx, ny)
+    return best[1], best[2]
+
+
+# ---------------------------------------------------
+# Worker side
+# ---------------------------------------------------
+class _Tile:
+    """The particles of one tile, as seen from the worker that owns it."""
+
+    def __init__(self, shared, t, geometry, rng):
+        self.a = shared
+        self.t = t
+        self.g = geometry
+        self.rng = rng
+
+        nx = geometry["nx"]
+        cx, cy = t % nx, t // nx
+        self.x0, self.x1 = cx * geometry["tile_w"], (cx + 1) * geometry["tile_w"]
+        self.y0, self.y1 = cy * geometry["tile_h"], (cy + 1) * geometry["tile_h"]
+        self.neighbors = [
+            (cy + dy) * nx + (cx + dx)
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+            if (dx or dy) and 0 <= cx + dx < nx and 0 <= cy + dy < geometry["ny"]
+        ]
+
+    def _fail(self, what):
+        self.a.error[self.t] = 1
+        raise RuntimeError(f"tile {self.t}: {what} capacity exceeded")
+
+    # --- Phase 1 ---
+    def move(self):
+        a, t, g = self.a, self.t, self.g
+        factor = a.ctrl[SPEED]
+        for x, y, n, speed in (
+            (a.ex[t], a.ey[t], a.ne[t], g["enzyme_speed"]),
+            (a.sx[t], a.sy[t], a.ns[t], g["substrate_speed"]),
+        ):
+            noise = self.rng.uniform(-1, 1, (2, n))
+            x[:n] += noise[0] * speed * factor
+            y[:n] += noise[1] * speed * factor
+            np.clip(x[:n], 0, g["width"], out=x[:n])
+            np.clip(y[:n], 0, g["height"], out=y[:n])
+
+        # --- Particles that left the tile go to the outbox ---
+        n = a.ne[t]
+        dest = _tile_ids(a.ex[t, :n], a.ey[t, :n], g)
+        leave = np.flatnonzero(dest != t)
+        k = len(leave)
+        if k > a.oex.shape[1]:
+            self._fail("enzyme outbox")
+        for src, out in ((a.ex, a.oex), (a.ey, a.oey), (a.eact, a.oeact), (a.estate, a.oestate)):
+            out[t, :k] = src[t, leave]
+        a.oed[t, :k] = dest[leave]
+        a.noe[t] = k
+        a.ne[t] = swap_remove((a.ex[t], a.ey[t], a.eact[t], a.estate[t]), n, leave)
+
+        n = a.ns[t]
+        dest = _tile_ids(a.sx[t, :n], a.sy[t, :n], g)
+        leave = np.flatnonzero(dest != t)
+        k = len(leave)
+        if k > a.osx.shape[1]:
+            self._fail("substrate outbox")
+        a.osx[t, :k] = a.sx[t, leave]
+        a.osy[t, :k] = a.sy[t, leave]
+        a.osd[t, :k] = dest[leave]
+        a.nos[t] = k
+        a.ns[t] = swap_remove((a.sx[t], a.sy[t]), n, leave)
+
+    # --- Phase 2 ---
+    def migrate(self):
+        a, t = self.a, self.t
+        for nb in self.neighbors:
+            arriving = np.flatnonzero(a.oed[nb, :a.noe[nb]] == t)
+            n, k = a.ne[t], len(arriving)
+            if n + k > a.ex.shape[1]:
+                self._fail("enzyme")
+            for out, dst in ((a.oex, a.ex), (a.oey, a.ey), (a.oeact, a.eact), (a.oestate, a.estate)):
+                dst[t, n:n + k] = out[nb, arriving]
+            a.ne[t] = n + k
+
+            arriving = np.flatnonzero(a.osd[nb, :a.nos[nb]] == t)
+            n, k = a.ns[t], len(arriving)
+            if n + k > a.sx.shape[1]:
+                self._fail("substrate")
+            a.sx[t, n:n + k] = a.osx[nb, arriving]
+            a.sy[t, n:n + k] = a.osy[nb, arriving]
+            a.ns[t] = n + k
+
+        # --- Halo: own substrates within contact distance of the tile edge ---
+        h = self.g["halo"]
+        n = a.ns[t]
+        x, y = a.sx[t, :n], a.sy[t, :n]
+        near = np.flatnonzero((x - self.x0 < h) | (self.x1 - x < h) | (y - self.y0 < h) | (self.y1 - y < h))
+        k = len(near)
+        a.hx[t, :k] = x[near]
+        a.hy[t, :k] = y[near]
+        a.hi[t, :k] = near
+        a.nh[t] = k
+
+    # --- Phase 3 ---
+    def bind(self):
+        a, t, g = self.a, self.t, self.g
+        a.npairs[t] = 0
+        free = np.flatnonzero(a.estate[t, :a.ne[t]] == 0)
+        if len(free) == 0:
+            return
+
+        # --- Candidate substrates: own ones plus neighbor halos touching this tile ---
+        h = g["halo"]
+        bx, by = [a.sx[t, :a.ns[t]]], [a.sy[t, :a.ns[t]]]
+        btile, bidx = [np.full(a.ns[t], t)], [np.arange(a.ns[t])]
+        for nb in self.neighbors:
+            k = a.nh[nb]
+            x, y = a.hx[nb, :k], a.hy[nb, :k]
+            close = (x > self.x0 - h) & (x < self.x1 + h) & (y > self.y0 - h) & (y < self.y1 + h)
+            bx.append(x[close])
+            by.append(y[close])
+            btile.append(np.full(int(close.sum()), nb))
+            bidx.append(a.hi[nb, :k][close])
+        bx, by = np.concatenate(bx), np.concatenate(by)
+        if len(bx) == 0:
+            return
+        btile, bidx = np.concatenate(btile), np.concatenate(bidx)
+
+        # Local coordinates keep the cell list as small as the tile plus its halo
+        ox, oy = self.x0 - h, self.y0 - h
+        i, j = find_contacts(
+            a.ex[t, free] - ox, a.ey[t, free] - oy, np.full(len(free), g["enzyme_radius"]),
+            bx - ox, by - oy, np.full(len(bx), g["substrate_radius"]),
+            self.x1 - self.x0 + 2 * h, self.y1 - self.y0 + 2 * h
+        )
+        if len(i) == 0:
+            return
+        i = free[i]
+
+        bind_prob = BIND_PROBABILITY * a.eact[t, i] * a.ctrl[BIND_MOD]
+        draw = self.rng.random(len(i))
+        accepted = np.flatnonzero(draw < bind_prob)
+        k = len(accepted)
+        if k > a.pe.shape[1]:
+            self._fail("pair")
+        a.pe[t, :k] = i[accepted]
+        a.pst[t, :k] = btile[j[accepted]]
+        a.psi[t, :k] = bidx[j[accepted]]
+        a.pp[t, :k] = draw[accepted] / bind_prob[accepted]
+        a.npairs[t] = k
+
+    # --- Phase 5 ---
+    def catalyze(self):
+        a, t = self.a, self.t
+        bound = np.flatnonzero(a.estate[t, :a.ne[t]])
+        cat_prob = CATALYSIS_PROBABILITY * a.eact[t, bound] * a.ctrl[CAT_MOD]
+        released = bound[self.rng.random(len(bound)) < cat_prob]
+        a.estate[t, released] = 0
+        a.released[t] = len(released)
+
+
+def _tile_worker(shared, t, geometry, rng, barrier):
+    """Process entry point: step tile `t` in lock-step with the parent."""
+    tile = _Tile(shared, t, geometry, rng)
+    try:
+        while True:
+            barrier.wait()                  # parent wrote the control slots
+            if shared.ctrl[COMMAND] == EXIT:
+                break
+            tile.move()
+            barrier.wait()
+            tile.migrate()
+            barrier.wait()
+            tile.bind()
+            barrier.wait()
+            barrier.wait()                  # parent resolved the pairs
+            tile.catalyze()
+            barrier.wait()
+    except BrokenBarrierError:
+        pass
+    except Exception:
+        barrier.abort()
+        raise
+    finally:
+        shared.close()
+
+
+# ---------------------------------------------------
+# Parent side
+# ---------------------------------------------------
+class TiledSimulation:
+    """
+    Step a spatial SimulationState with one worker process per tile.
+
+    The tile grid defaults to one tile per CPU core. Tiles must be larger
+    than one step of the fastest particle and than the contact distance,
+    so particles only ever migrate to and bind across adjacent tiles.
+    """
+
+    def __init__(self, sim, tiles=None, capacity_factor=2.0):
+        self.sim = sim
+        nx, ny = tiles if tiles is not None else tile_grid(os.cpu_count() or 1, sim.width, sim.height)
+        self.tiles = T = nx * ny
+
+        enzymes, substrates = sim.enzyme_store, sim.substrate_store
+        self.geometry = g = {
+            "nx": nx, "ny": ny,
+            "width": float(sim.width), "height": float(sim.height),
+            "tile_w": sim.width / nx, "tile_h": sim.height / ny,
+            "enzyme_radius": float(enzymes.radius.max(initial=Enzyme.default_radius)),
+            "substrate_radius": float(substrates.radius.max(initial=Substrate.default_radius)),
+            "enzyme_speed": Enzyme.default_speed,
+            "substrate_speed": Substrate.default_speed,
+        }
+        g["halo"] = g["enzyme_radius"] + g["substrate_radius"]
+        reach = max(g["enzyme_speed"], g["substrate_speed"]) * self._speed_factor()
+        if min(g["tile_w"], g["tile_h"]) <= max(g["halo"], reach):
+            raise ValueError(
+                f"Tiles of {g['tile_w']:.1f} x {g['tile_h']:.1f} are too small for a contact "
+                f"distance of {g['halo']:.1f} and steps of up to {reach:.1f}; use fewer tiles"
+            )
+
+        # --- Products are only counted from here on ---
+        sim.products_sunk += len(sim.product_store)
+        sim.product_store.clear()
+
+        # --- Shared arrays sized from the initial distribution ---
+        e_tile = _tile_ids(enzymes.x, enzymes.y, g)
+        s_tile = _tile_ids(substrates.x, substrates.y, g)
+        Ce = max(int(capacity_factor * np.bincount(e_tile, minlength=T).max(initial=0)), 64)
+        Cs = max(int(capacity_factor * np.bincount(s_tile, minlength=T).max(initial=0)), 64)
+        self.shared = a = SharedArrays({
+            "ctrl": ((4,), np.float64),
+            "error": ((T,), np.int64),
+            "released": ((T,), np.int64),
+            # tile-owned particles
+            "ex": ((T, Ce), np.float64), "ey": ((T, Ce), np.float64),
+            "eact": ((T, Ce), np.float64), "estate": ((T, Ce), np.int8), "ne": ((T,), np.int64),
+            "sx": ((T, Cs), np.float64), "sy": ((T, Cs), np.float64), "ns": ((T,), np.int64),
+            # outboxes of particles leaving each tile
+            "oex": ((T, Ce), np.float64), "oey": ((T, Ce), np.float64),
+            "oeact": ((T, Ce), np.float64), "oestate": ((T, Ce), np.int8),
+            "oed": ((T, Ce), np.int64), "noe": ((T,), np.int64),
+            "osx": ((T, Cs), np.float64), "osy": ((T, Cs), np.float64),
+            "osd": ((T, Cs), np.int64), "nos": ((T,), np.int64),
+            # halo exports (substrates near each tile's edge)
+            "hx": ((T, Cs), np.float64), "hy": ((T, Cs), np.float64),
+            "hi": ((T, Cs), np.int64), "nh": ((T,), np.int64),
+            # accepted enzyme-substrate pairs of each tile
+            "pe": ((T, Cs), np.int64), "pst": ((T, Cs), np.int64),
+            "psi": ((T, Cs), np.int64), "pp": ((T, Cs), np.float64), "npairs": ((T,), np.int64),
+        })
+        self.enzyme_capacity, self.substrate_capacity = Ce, Cs
+
+        act = sim.enzyme_activity()
+        for t in range(T):
+            mine = np.flatnonzero(e_tile == t)
+            k = len(mine)
+            a.ex[t, :k], a.ey[t, :k] = enzymes.x[mine], enzymes.y[mine]
+            a.eact[t, :k], a.estate[t, :k] = act[mine], enzymes.state[mine]
+            a.ne[t] = k
+            mine = np.flatnonzero(s_tile == t)
+            k = len(mine)
+            a.sx[t, :k], a.sy[t, :k] = substrates.x[mine], substrates.y[mine]
+            a.ns[t] = k
+
+        # --- One worker per tile, each with its own random stream ---
+        ctx = mp.get_context("spawn")
+        self._barrier = ctx.Barrier(T + 1)
+        self._workers = [
+            ctx.Process(target=_tile_worker, args=(a, t, g, rng, self._barrier), daemon=True)
+            for t, rng in enumerate(sim.spawn_rngs(T))
+        ]
+        with bare_main():
+            for worker in self._workers:
+                worker.start()
+        self._closed = False
+
+    def _speed_factor(self):
+        return self.sim.base_speed * self.sim.temperature_speed_factor()
+
+    @property
+    def substrates_remaining(self):
+        return int(self.shared.ns.sum())
+
+    @property
+    def enzyme_total(self):
+        return int(self.shared.ne.sum())
+
+    def _wait(self, phases=1):
+        try:
+            for _ in range(phases):
+                self._barrier.wait()
+        except BrokenBarrierError:
+            errors = np.flatnonzero(self.shared.error)
+            raise RuntimeError(
+                f"Tile worker(s) {errors.tolist()} failed; raise capacity_factor or use fewer tiles"
+                if len(errors) else "A tile worker failed"
+            ) from None
+
+    def _resolve(self):
+        """Match the accepted pairs of all tiles, bind the winners and remove their substrates."""
+        a = self.shared
+        Ce, Cs = self.enzyme_capacity, self.substrate_capacity
+        tiles = np.flatnonzero(a.npairs)
+        if len(tiles) == 0:
+            return
+        e = np.concatenate([t * Ce + a.pe[t, :a.npairs[t]] for t in tiles])
+        s = np.concatenate([a.pst[t, :a.npairs[t]] * Cs + a.psi[t, :a.npairs[t]] for t in tiles])
+        priority = np.concatenate([a.pp[t, :a.npairs[t]] for t in tiles])
+
+        e, s = resolve_pairs(e, s, priority)
+        e_tile, e_idx = np.divmod(e, Ce)
+        a.estate[e_tile, e_idx] = 1
+        s_tile, s_idx = np.divmod(s, Cs)
+        for t in np.unique(s_tile):
+            a.ns[t] = swap_remove((a.sx[t], a.sy[t]), a.ns[t], s_idx[s_tile == t])
+
+    def step(self):
+        """Advance the whole box by one simulation step."""
+        sim, a = self.sim, self.shared
+        a.ctrl[SPEED] = self._speed_factor()
+        conditions = Conditions(sim, substrates_remaining=self.substrates_remaining)  # live, not the template's
+        a.ctrl[BIND_MOD] = sim.kinetic_model.binding_modifier(conditions)
+        a.ctrl[CAT_MOD] = sim.kinetic_model.catalysis_modifier(conditions)
+        a.ctrl[COMMAND] = STEP
+
+        self._wait(4)       # start, moved, migrated, pairs drawn
+        self._resolve()
+        self._wait(2)       # resolved, catalysis done
+
+        released = int(a.released.sum())
+        sim.products_sunk += released
+        sim.record_step(released)
+
+    def run(self, max_steps=MAX_STEPS, threshold=PLATEAU_THRESHOLD, intervals=PLATEAU_INTERVALS):
+        """Step until a stop rule fires (stop_reason on the live substrate count); sync and return the reason."""
+        reason = None
+        while reason is None:
+            self.step()
+            live = Conditions(self.sim, substrates_remaining=self.substrates_remaining)
+            reason = stop_reason(live, threshold, intervals, max_steps)
+        self.sync()
+        return reason
+
+    def sync(self):
+        """Write the tile particles back into the template's stores (enzymes get the default parameters)."""
+        sim, a = self.sim, self.shared
+        T = self.tiles
+
+        def gather(arr, counts):
+            return np.concatenate([arr[t, :counts[t]] for t in range(T)])
+
+        sim.enzyme_store.clear()
+        sim.enzyme_store.add(
+            gather(a.ex, a.ne), gather(a.ey, a.ne),
+            state=gather(a.estate, a.ne),
+            km=sim.default_km,
+            optimal_temp=sim.default_optimal_temp,
+            optimal_pH=sim.default_optimal_pH
+        )
+        sim.substrate_store.clear()
+        sim.substrate_store.add(gather(a.sx, a.ns), gather(a.sy, a.ns))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.shared.ctrl[COMMAND] = EXIT
+        try:
+            self._barrier.wait(timeout=5)
+        except BrokenBarrierError:
+            pass
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
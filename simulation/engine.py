@@ -1,10 +1,20 @@
 # simulation/engine.py
 
+import time
+
 import numpy as np
-from simulation.collision import check_collision
-from models.product import Product
-from models.complex import ESComplex
-from kinetics.modifiers import activity_modifier
+from simulation.collision import find_contacts, resolve_pairs
+from kinetics.rates import BIND_PROBABILITY, CATALYSIS_PROBABILITY
+from simulation.wellmixed import step_well_mixed
+from simulation.meanfield import step_mean_field
+from simulation.termination import stop_reason
+from simulation.snapshots import Snapshots
+
+# --- Non-spatial engines selectable through SimulationState.engine ---
+ENGINES = {
+    "well_mixed": step_well_mixed,
+    "mean_field": step_mean_field,
+}
 
 def step_simulation(sim):
     """
@@ -13,56 +23,173 @@ def step_simulation(sim):
     - Bind free enzymes to substrates
     - Catalyze product formation
     - Track per-step product and sampled histories
+
+    Simulations with sim.engine set to another registered engine
+    (e.g. "well_mixed", "mean_field") are delegated to that engine.
+
+    With sim.profiler attached, each phase is timed separately.
     """
+    prof = sim.profiler
+    if prof is not None:
+        t = time.perf_counter()
+        prof.count("steps")
+
+    if sim.engine != "spatial":
+        ENGINES[sim.engine](sim)
+        if prof is not None:
+            prof.lap(sim.engine, t)
+        return
 
     # --- Compute speed factor from temperature ---
     speed_factor = sim.base_speed * sim.temperature_speed_factor()
 
-    # --- Move all particles ---
-    for p in sim.enzymes + sim.substrates + sim.products:
-        p.move(sim.width, sim.height, speed_factor)
+    # --- Move all particles (one vectorized pass per species) ---
+    move_particles(sim, speed_factor)
+    if prof is not None:
+        t = prof.lap("move", t)
 
     # --- Enzyme-substrate binding ---
-    for enzyme in list(sim.enzymes):
-        if enzyme.bound:
-            continue  # skip busy enzymes
+    bound = bind_substrates(sim)
+    if prof is not None:
+        t = prof.lap("bind", t)
 
-        for substrate in list(sim.substrates):
-            if check_collision(enzyme, substrate):
-                # Activity modifier based on temperature/pH
-                act = activity_modifier(enzyme, sim.environment)
-                bind_prob = 0.2 * act * sim.kinetic_model.binding_modifier(sim)
+    # --- Catalysis step ---
+    released = catalyze(sim)
+    product_formed_this_step = len(released)
+    if prof is not None:
+        t = prof.lap("catalysis", t)
 
-                if np.random.rand() < bind_prob:
-                    # Form complex
-                    sim.substrates.remove(substrate)
-                    enzyme.bound = True
-                    sim.complexes.append(ESComplex(enzyme))
+    # --- Update time and histories ---
+    sim.record_step(product_formed_this_step)
+    if prof is not None:
+        t = prof.lap("history", t)
 
-                    break  # one substrate per enzyme
+    # --- Stream the trajectory, if a recorder is attached ---
+    if sim.recorder is not None:
+        sim.recorder.record(sim, bound=bound, released=released)
+        if prof is not None:
+            prof.lap("recorder", t)
 
-    # --- Catalysis step ---
-    product_formed_this_step = 0
 
-    for complex in list(sim.complexes):
-        act = activity_modifier(complex.enzyme, sim.environment)
-        cat_prob = 0.1 * act * sim.kinetic_model.catalysis_modifier(sim)
+def run_until_stop(sim, max_steps=None, snapshot_stride=None, **rules):
+    """
+    Step `sim` without rendering until a stop rule fires.
 
-        if np.random.rand() < cat_prob:
-            # Product formation
-            sim.complexes.remove(complex)
-            complex.enzyme.bound = False
-            sim.products.append(Product(complex.x, complex.y))
-            product_formed_this_step += 1
+    With snapshot_stride set, particle positions are recorded every
+    `snapshot_stride` steps (plus the initial and final state) for later
+    replay. Extra keyword arguments go to stop_reason (threshold, intervals).
+    Returns (reason, snapshots); snapshots is None when not recorded.
+    """
+    snapshots = None
+    if snapshot_stride and sim.engine == "spatial":
+        snapshots = Snapshots(sim.width, sim.height, snapshot_stride)
+        snapshots.add(sim)
 
-    # --- Update time and histories ---
-    sim.time += 1
-    sim.time_history.append(sim.time)
-    sim.product_history.append(len(sim.products))
-    sim.rate_history.append(product_formed_this_step)  # per-step production
-
-    # --- Sampling every N steps for statistics ---
-    sim.step_counter += 1
-    if sim.step_counter % sim.sample_interval == 0:
-        sim.history_time_sampled.append(sim.time)
-        sim.history_product_sampled.append(len(sim.products))
+    reason = None
+    while reason is None:
+        step_simulation(sim)
+        reason = stop_reason(sim, max_steps=max_steps, **rules)
+        if snapshots is not None and (reason is not None or snapshots.due(sim)):
+            snapshots.add(sim)
+
+    return reason, snapshots
+
+
+def move_particles(sim, speed_factor):
+    stores = (sim.enzyme_store, sim.substrate_store, sim.product_store, sim.inhibitor_store)
+
+    # One block of displacements for every particle of every species
+    total = sum(len(store) for store in stores)
+    noise = sim.random.uniform(-1, 1, 2 * total).reshape(2, total)
+
+    start = 0
+    for store in stores:
+        stop = start + len(store)
+        store.move(sim.width, sim.height, speed_factor, noise=noise[:, start:stop])
+        start = stop
+
+
+def bind_substrates(sim):
+    """
+    Bind free enzymes to colliding substrates.
+
+    Contacts come from a cell-list neighbor search; every contact gets one
+    bind draw and accepted contacts are matched so that each enzyme takes
+    at most one substrate and each substrate goes to at most one enzyme.
+    Returns the indices of the enzymes that bound.
+    """
+    enzymes = sim.enzyme_store
+    substrates = sim.substrate_store
+
+    no_binding = np.empty(0, dtype=np.int64)
+    free = np.flatnonzero(enzymes.state == 0)
+    if len(free) == 0 or len(substrates) == 0:
+        return no_binding
+
+    # --- Candidate enzyme-substrate contacts ---
+    i, j = find_contacts(
+        enzymes.x[free], enzymes.y[free], enzymes.radius[free],
+        substrates.x, substrates.y, substrates.radius,
+        sim.width, sim.height, profiler=sim.profiler
+    )
+    if len(i) == 0:
+        return no_binding
+    i = free[i]
+
+    # --- Bind draws (activity modifier based on temperature/pH, model factor per contact) ---
+    act = sim.enzyme_activity()
+    bind_prob = BIND_PROBABILITY * act[i] * sim.kinetic_model.binding_factors(sim, i, j)
+
+    draw = sim.random.random(len(i))
+    accepted = draw < bind_prob
+    if sim.profiler is not None:
+        sim.profiler.count("bind_attempts", len(i))
+        sim.profiler.count("binds_accepted", accepted.sum())
+    if not accepted.any():
+        return no_binding
+
+    # --- One substrate per enzyme, one enzyme per substrate ---
+    # draw / bind_prob is uniform on [0, 1) for accepted pairs: a random priority
+    e, s = resolve_pairs(i[accepted], j[accepted], draw[accepted] / bind_prob[accepted])
+
+    enzymes.state[e] = 1
+    substrates.remove(s)
+    return e
+
+
+def catalyze(sim):
+    """Release products from ES complexes. Returns the indices of the releasing enzymes."""
+    enzymes = sim.enzyme_store
+
+    bound = np.flatnonzero(enzymes.state)
+    if len(bound) == 0:
+        return bound
+
+    act = sim.enzyme_activity()
+    cat_prob = CATALYSIS_PROBABILITY * act[bound] * sim.kinetic_model.catalysis_factors(sim, bound)
+
+    released = bound[sim.random.random(len(bound)) < cat_prob]
+    if sim.profiler is not None:
+        sim.profiler.count("catalysis_attempts", len(bound))
+        sim.profiler.count("products_released", len(released))
+    enzymes.state[released] = 0
+    sim.product_store.add(enzymes.x[released], enzymes.y[released], born=sim.time)
+    if sim.product_sink is not None:
+        sink_products(sim)
+
+    return released
+
+
+def sink_products(sim):
+    """
+    Product sink: keep only the newest sim.product_sink products as moving
+    particles and add the older ones to sim.products_sunk. Products take no
+    part in any reaction, so product_total and the histories stay exact.
+    """
+    products = sim.product_store
+    excess = len(products) - sim.product_sink
+    if excess <= 0:
+        return
+    oldest = np.argpartition(products.born, excess - 1)[:excess]
+    products.remove(oldest)
+    sim.products_sunk += excess
@@ -0,0 +1,184 @@
+# simulation/ensemble.py
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from models.enzyme import Enzyme
+from models.substrate import Substrate
+from simulation.collision import find_contacts, resolve_pairs
+from simulation.termination import MAX_STEPS, PLATEAU_THRESHOLD, PLATEAU_INTERVALS
+from kinetics.base_model import Conditions
+from kinetics.rates import BIND_PROBABILITY, CATALYSIS_PROBABILITY
+
+
+class Ensemble:
+    """
+    R independent replicas of one SimulationState configuration, advanced together.
+
+    Replica state lives in stacked (R, N) arrays, so movement, binding draws
+    and catalysis draws are computed once per step for all replicas.
+    Products are only counted (no positions are kept, so sim.product_sink
+    makes no difference). Replicas follow the spatial engine with the
+    global inhibitor count; other engines and inhibitor particles are
+    rejected rather than silently replaced.
+    """
+
+    def __init__(self, sim, replicas=100, seed=None):
+        if sim.engine != "spatial" or sim.explicit_inhibitors:
+            raise ValueError("Ensemble replicates the spatial engine without inhibitor particles")
+        self.sim = sim  # template: parameters, environment and kinetic model
+        self.replicas = R = int(replicas)
+
+        # --- Own random stream: from `seed`, or a child of the template's stream ---
+        self.seed = seed
+        self.rng = np.random.default_rng(seed) if seed is not None else sim.spawn_rngs(1)[0]
+        rng = self.rng
+        E, S = sim.enzyme_count, sim.substrate_count
+
+        # --- Per-enzyme parameters (same layout as the single-run store) ---
+        self.enzyme_params = Enzyme.make_store(capacity=E)
+        self.enzyme_params.add(
+            x=np.zeros(E), y=np.zeros(E),
+            km=sim.default_km,
+            optimal_temp=sim.default_optimal_temp,
+            optimal_pH=sim.default_optimal_pH
+        )
+
+        # --- Stacked replica state ---
+        self.ex = rng.uniform(0, sim.width, (R, E))
+        self.ey = rng.uniform(0, sim.height, (R, E))
+        self.bound = np.zeros((R, E), dtype=bool)
+
+        self.sx = rng.uniform(0, sim.width, (R, S))
+        self.sy = rng.uniform(0, sim.height, (R, S))
+        self.alive = np.ones((R, S), dtype=bool)
+
+        self.products = np.zeros(R, dtype=np.int64)
+
+        # --- Histories (one column per replica) ---
+        self.time = 0
+        self.time_history = []
+        self.product_history = []
+        self.history_time_sampled = []
+        self.history_product_sampled = []
+
+    def step(self):
+        """Advance every replica by one simulation step."""
+        sim = self.sim
+        rng = self.rng
+        R, E = self.ex.shape
+        speed_factor = sim.base_speed * sim.temperature_speed_factor()
+
+        # --- Move all replicas at once ---
+        for x, y, speed in (
+            (self.ex, self.ey, Enzyme.default_speed),
+            (self.sx, self.sy, Substrate.default_speed),
+        ):
+            noise = rng.uniform(-1, 1, (2,) + x.shape)
+            x += noise[0] * speed * speed_factor
+            y += noise[1] * speed * speed_factor
+            np.clip(x, 0, sim.width, out=x)
+            np.clip(y, 0, sim.height, out=y)
+
+        act = sim.activity_cache.activity(self.enzyme_params, sim.environment)
+
+        # --- Model modifiers per replica, from its own substrate count ---
+        conditions = Conditions(sim, substrates_remaining=self.alive.sum(axis=1))
+        bind_mod = np.broadcast_to(sim.kinetic_model.binding_modifier(conditions), (R,))
+        cat_mod = np.broadcast_to(sim.kinetic_model.catalysis_modifier(conditions), (R,))
+
+        # --- Binding: replicas side by side along x in one contact search ---
+        free = np.flatnonzero(~self.bound.ravel())
+        sub = np.flatnonzero(self.alive.ravel())
+        if len(free) and len(sub):
+            pad = sim.width + 2 * (Enzyme.default_radius + Substrate.default_radius)
+            eoff = (free // E) * pad
+            soff = (sub // self.sx.shape[1]) * pad
+
+            i, j = find_contacts(
+                self.ex.ravel()[free] + eoff, self.ey.ravel()[free],
+                np.full(len(free), float(Enzyme.default_radius)),
+                self.sx.ravel()[sub] + soff, self.sy.ravel()[sub],
+                np.full(len(sub), float(Substrate.default_radius)),
+                R * pad, sim.height
+            )
+            if len(i):
+                i, j = free[i], sub[j]
+                bind_prob = BIND_PROBABILITY * act[i % E] * bind_mod[i // E]
+                draw = rng.random(len(i))
+                accepted = draw < bind_prob
+                e, s = resolve_pairs(i[accepted], j[accepted], draw[accepted] / bind_prob[accepted])
+                self.bound.flat[e] = True
+                self.alive.flat[s] = False
+
+        # --- Catalysis: one draw per enzyme per replica ---
+        cat_prob = CATALYSIS_PROBABILITY * act * cat_mod[:, None]
+        released = self.bound & (rng.random((R, E)) < cat_prob)
+        self.bound &= ~released
+        self.products += released.sum(axis=1)
+
+        # --- Histories ---
+        self.time += 1
+        self.time_history.append(self.time)
+        self.product_history.append(self.products.copy())
+        if self.time % sim.sample_interval == 0:
+            self.history_time_sampled.append(self.time)
+            self.history_product_sampled.append(self.products.copy())
+
+    def finished(self, threshold=PLATEAU_THRESHOLD, intervals=PLATEAU_INTERVALS):
+        """Boolean (R,) mask of replicas that meet the plateau or exhaustion stop rule."""
+        done = ~self.alive.any(axis=1)
+        if len(self.history_product_sampled) >= intervals + 1:
+            recent = np.stack(self.history_product_sampled[-(intervals + 1):])
+            done |= (np.diff(recent, axis=0) <= threshold).all(axis=0)
+        return done
+
+    def run(self, steps=None, max_steps=MAX_STEPS):
+        """Run `steps` steps, or until every replica meets a stop rule."""
+        if steps is not None:
+            for _ in range(steps):
+                self.step()
+            return self
+        while self.time < max_steps:
+            self.step()
+            if self.time % self.sim.sample_interval == 0 and self.finished().all():
+                break
+        return self
+
+    def summary(self, confidence=0.95):
+        """
+        Mean product curve with a confidence band for the mean and the
+        replica spread (percentile band) at every step.
+        """
+        products = np.stack(self.product_history).astype(float)  # (T, R)
+        mean = products.mean(axis=1)
+        std = products.std(axis=1, ddof=1) if self.replicas > 1 else np.zeros_like(mean)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        half = z * std / np.sqrt(self.replicas)
+        tail = (1 - confidence) / 2 * 100
+
+        return pd.DataFrame({
+            "Time": self.time_history,
+            "Mean": mean,
+            "Std Dev": std,
+            "CI Low": mean - half,
+            "CI High": mean + half,
+            "Band Low": np.percentile(products, tail, axis=1),
+            "Band High": np.percentile(products, 100 - tail, axis=1),
+        })
+
+    def interval_stats(self):
+        """Products per sample interval, pooled over replicas (same columns as the single-run table)."""
+        label = f"Products per {self.sim.sample_interval} steps"
+        if not self.history_product_sampled:
+            return pd.DataFrame({"Min": [0], "Mean": [0], "Std Dev": [0], "Max": [0]}, index=[label])
+        sampled = np.stack(self.history_product_sampled)
+        interval = np.diff(np.vstack([np.zeros((1, self.replicas)), sampled]), axis=0)
+        return pd.DataFrame({
+            "Min": interval.min(),
+            "Mean": interval.mean(),
+            "Std Dev": interval.std(),
+            "Max": interval.max(),
+        }, index=[label])
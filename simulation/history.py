@@ -0,0 +1,105 @@
+# simulation/history.py
+import numpy as np
+
+
+class HistoryBuffer:
+    """
+    Preallocated, growable NumPy buffer for a time series.
+
+    Appends are amortized O(1). With `maxlen` set it becomes a ring buffer
+    that keeps only the most recent `maxlen` values; every value is written
+    twice (at i and i + maxlen) so the ordered window is always one
+    contiguous slice and `values` never copies.
+
+    Reads behave like a list/array: len(), indexing, slicing and iteration.
+    """
+
+    def __init__(self, dtype=float, capacity=1024, maxlen=None):
+        self.dtype = np.dtype(dtype)
+        self.maxlen = maxlen
+        self.count = 0  # total values ever appended (>= len when capped)
+        size = 2 * maxlen if maxlen else max(int(capacity), 1)
+        self._buf = np.zeros(size, dtype=self.dtype)
+
+    @property
+    def values(self):
+        """Ordered view of the stored values (no copy)."""
+        if self.maxlen is None:
+            return self._buf[:self.count]
+        n = min(self.count, self.maxlen)
+        start = self.count % self.maxlen if self.count > self.maxlen else 0
+        return self._buf[start:start + n]
+
+    def append(self, value):
+        if self.maxlen is None:
+            if self.count == len(self._buf):
+                grown = np.zeros(2 * len(self._buf), dtype=self.dtype)
+                grown[:self.count] = self._buf
+                self._buf = grown
+            self._buf[self.count] = value
+        else:
+            i = self.count % self.maxlen
+            self._buf[i] = value
+            self._buf[i + self.maxlen] = value
+        self.count += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.dtype)
+        if self.maxlen is not None:
+            for value in values:
+                self.append(value)
+            return
+        needed = self.count + len(values)
+        if needed > len(self._buf):
+            grown = np.zeros(max(2 * len(self._buf), needed), dtype=self.dtype)
+            grown[:self.count] = self._buf[:self.count]
+            self._buf = grown
+        self._buf[self.count:needed] = values
+        self.count = needed
+
+    def clear(self):
+        self.count = 0
+
+    def tolist(self):
+        return self.values.tolist()
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.values, dtype=dtype)
+
+    def __repr__(self):
+        return f"HistoryBuffer({self.values!r})"
+
+
+class RunningStats:
+    """Welford accumulator: count, mean, population std, min and max in O(1) per value."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def std(self):
+        return (self._m2 / self.count) ** 0.5 if self.count else 0.0
@@ -0,0 +1,150 @@
+# simulation/meanfield.py
+"""
+Mean-field engine: the deterministic (ODE) limit of E + S -> ES -> E + P.
+
+    dS/dt  = -k_bind E S
+    dES/dt =  k_bind E S - k_cat ES      (E = E0 - ES)
+    dP/dt  =  k_cat ES
+
+k_bind and k_cat are the well-mixed engine's rate constants (same base
+probabilities, activity_modifier and kinetic-model modifiers), held fixed
+over each step as the stochastic engines hold them, and every step is one
+or more classic RK4 stages. The state is one float array of shape
+(4, *grid), so integrate_grid() runs a whole temperature x pH x substrate
+x inhibitor grid with the same few array operations per step as a single
+run; step_mean_field() is the single-run engine behind sim.engine =
+"mean_field".
+
+A grid run costs at most GRID_INTERVALS rate updates whatever its length:
+longer runs hold the rates over several steps at a time, and cells whose
+substrate is used up stop limiting the RK4 step.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from models.enzyme import Enzyme
+from models.substrate import Substrate
+from kinetics.base_model import Conditions
+from kinetics.modifiers import activity_modifier
+from kinetics.rates import BIND_PROBABILITY, CATALYSIS_PROBABILITY, hazard, contact_fraction
+from simulation.wellmixed import rate_constants
+
+SPECIES = ("E", "S", "ES", "P")
+MAX_RATE_STEP = 0.5   # largest (fastest rate x RK4 step); more substeps above it
+DEFAULT_STEPS = 1000  # grid horizon when the simulation has not run yet
+GRID_INTERVALS = 500  # most rate updates per grid run
+DONE = 1e-6  # substrate + complex left in a finished grid cell
+
+
+def _derivative(y, k_bind, k_cat):
+    E, S, ES, _ = y
+    bind = k_bind * E * S
+    cat = k_cat * ES
+    return np.stack((cat - bind, -bind, bind - cat, cat))
+
+
+def _advance(y, k_bind, k_cat, dt=1):
+    """Integrate y over dt steps with fixed rate constants (classic RK4)."""
+    fastest = np.max(k_bind * (y[0] + y[1]) + k_cat, initial=0.0)
+    n = max(int(np.ceil(fastest * dt / MAX_RATE_STEP)), 1)
+    h = dt / n
+    for _ in range(n):
+        k1 = _derivative(y, k_bind, k_cat)
+        k2 = _derivative(y + 0.5 * h * k1, k_bind, k_cat)
+        k3 = _derivative(y + 0.5 * h * k2, k_bind, k_cat)
+        k4 = _derivative(y + h * k3, k_bind, k_cat)
+        y = y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+    return np.maximum(y, 0.0)
+
+
+# ---------------------------------------------------
+# Single run (engine "mean_field")
+# ---------------------------------------------------
+def step_mean_field(sim):
+    """
+    Advance sim.counts by one step. Counts are fractional; the histories
+    get the product total rounded to whole products.
+    """
+    c = sim.counts
+    y = np.array([c[name] for name in SPECIES], dtype=float)
+    y = _advance(y, *rate_constants(sim))
+
+    before = round(c["P"])
+    c.update(zip(SPECIES, y.tolist()))
+    after = round(c["P"])
+    sim.record_step(after - before, product_total=after)
+
+
+# ---------------------------------------------------
+# Parameter grids
+# ---------------------------------------------------
+def integrate_grid(sim, steps=None, temperature=None, pH=None,
+                   substrate_count=None, inhibitor_count=None, enzyme_count=None,
+                   intervals=GRID_INTERVALS):
+    """
+    Integrate the mean-field system for every combination of parameters at once.
+
+    Each parameter is a value or a 1-D array (None: the value in `sim`);
+    the grid gets one axis per array, in argument order. Runs `steps` steps
+    (default: sim.time, or DEFAULT_STEPS before a run) from free enzymes and
+    substrates, in at most `intervals` intervals of fixed rates. Returns
+    (times, products): the times of every sim.sample_interval-th step
+    (rounded up to an interval end) plus the last one, and the product
+    totals there with shape (len(times), *grid).
+    """
+    if steps is None:
+        steps = sim.time or DEFAULT_STEPS
+    stride = -(-steps // intervals)  # steps per interval
+    params = {
+        "temperature": sim.environment["temperature"] if temperature is None else temperature,
+        "pH": sim.environment["pH"] if pH is None else pH,
+        "substrate_count": sim.substrate_count if substrate_count is None else substrate_count,
+        "inhibitor_count": sim.inhibitor_count if inhibitor_count is None else inhibitor_count,
+        "enzyme_count": sim.enzyme_count if enzyme_count is None else enzyme_count,
+    }
+    params = {name: np.asarray(value, dtype=float) for name, value in params.items()}
+    axes = [name for name, value in params.items() if value.ndim]
+    for name, value in zip(axes, np.meshgrid(*(params[name] for name in axes), indexing="ij")):
+        params[name] = value
+    shape = np.broadcast_shapes(*(value.shape for value in params.values()))
+
+    y = np.zeros((4,) + shape)
+    y[0] = params["enzyme_count"]
+    y[1] = params["substrate_count"]
+
+    # --- Constant over the run: activity and contact chance ---
+    enzyme = SimpleNamespace(optimal_temp=sim.default_optimal_temp, optimal_pH=sim.default_optimal_pH)
+    act = activity_modifier(enzyme, {"temperature": params["temperature"], "pH": params["pH"]})
+    contact = contact_fraction(Enzyme.default_radius, Substrate.default_radius, sim.width, sim.height)
+    model = sim.kinetic_model
+
+    times, products = [], []
+    t = 0
+    while t < steps:
+        dt = min(stride, steps - t)
+        conditions = Conditions(sim, engine="mean_field", explicit_inhibitors=False,
+                                inhibitor_count=params["inhibitor_count"], substrates_remaining=y[1])
+        k_bind = hazard(BIND_PROBABILITY * act * model.binding_modifier(conditions)) * contact
+        k_cat = hazard(CATALYSIS_PROBABILITY * act * model.catalysis_modifier(conditions))
+        # Finished cells keep their products; their rates would only shorten the RK4 step
+        active = y[1] + y[2] > DONE
+        y = _advance(y, np.where(active, k_bind, 0.0), np.where(active, k_cat, 0.0), dt)
+
+        if (t + dt) // sim.sample_interval > t // sim.sample_interval or t + dt == steps:
+            times.append(t + dt)
+            products.append(y[3])
+        t += dt
+
+    return np.array(times), np.array(products)
+
+
+def yield_map(sim, temperatures, pHs, steps=None):
+    """
+    Fraction of the substrate turned into product after `steps` steps on a
+    pH x temperature grid (rows follow pHs, columns temperatures); the
+    other parameters are those of `sim`.
+    """
+    _, products = integrate_grid(sim, steps, temperature=temperatures, pH=pHs)
+    return products[-1].T / max(sim.substrate_count, 1)
@@ -0,0 +1,88 @@
+# simulation/profiling.py
+"""
+Switchable per-phase profiling.
+
+Attach with sim.profiler = Profiler(); step_simulation then times each of
+its phases and counts collision checks, bind attempts and catalysis draws.
+With sim.profiler = None (the default) every hook is a single `is None`
+check, so an uninstrumented run pays next to nothing.
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    """Aggregate wall time per named phase (monotonic clock) and event counters."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.timings = {}   # name -> [calls, total seconds, max seconds]
+        self.counters = {}
+
+    def add(self, name, seconds):
+        entry = self.timings.get(name)
+        if entry is None:
+            entry = self.timings[name] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+
+    def lap(self, name, start):
+        """Charge the time since `start` to `name`; return now as the next start."""
+        now = time.perf_counter()
+        self.add(name, now - start)
+        return now
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    # --- Reports ---
+    def summary(self):
+        """Per-phase table: calls, total seconds, mean and max milliseconds, share of the total."""
+        import pandas as pd  # only needed for reports
+
+        total = sum(entry[1] for entry in self.timings.values()) or 1.0
+        rows = {
+            name: {
+                "Calls": calls,
+                "Total (s)": seconds,
+                "Mean (ms)": seconds / calls * 1e3,
+                "Max (ms)": longest * 1e3,
+                "Share": seconds / total,
+            }
+            for name, (calls, seconds, longest) in self.timings.items()
+        }
+        return pd.DataFrame.from_dict(
+            rows, orient="index",
+            columns=["Calls", "Total (s)", "Mean (ms)", "Max (ms)", "Share"]
+        )
+
+    def to_dict(self):
+        return {
+            "timings": {
+                name: {"calls": calls, "total_s": seconds, "max_s": longest}
+                for name, (calls, seconds, longest) in self.timings.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+def phase(profiler, name):
+    """Context manager timing `name` on `profiler`; a no-op when profiler is None."""
+    return profiler.phase(name) if profiler is not None else nullcontext()
@@ -0,0 +1,289 @@
+# simulation/recorder.py
+"""
+Streaming trajectory recorder and memory-mapped reader.
+
+A recording is a directory of columnar NumPy chunks plus meta.json:
+
+    meta.json               box, parameters, chunk size, position encoding
+    positions_00000.npy     (M, 2) positions of every particle, every step in the chunk
+    species_00000.npy       (M,) uint8 species code per row (ENZYME, SUBSTRATE, PRODUCT, COMPLEX, INHIBITOR)
+    offsets_00000.npy       (steps + 1,) row offsets of each step inside the chunk
+    steps_00000.npy         per-step time, product total and products formed
+    events_00000.npy        bind / catalysis events of the chunk
+    event_offsets_00000.npy (steps + 1,) event offsets of each step
+
+Positions are stored as uint16 fractions of the box by default (4 bytes
+per particle instead of 16), or as float32 with quantize=False. Only one
+chunk is buffered in memory while recording. Every step lives in a fixed
+chunk at a fixed offset, so the reader seeks to any step in O(1) through
+memory maps.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from kinetics.registry import get_model, model_name
+from simulation.state import SimulationState
+from simulation.snapshots import Snapshots, quantize_positions, dequantize_positions
+
+# --- Species codes (enzymes are written in store order, bound ones as COMPLEX) ---
+ENZYME, SUBSTRATE, PRODUCT, COMPLEX, INHIBITOR = 0, 1, 2, 3, 4
+
+# --- Event kinds ---
+BIND, CATALYSIS = 0, 1
+
+STEP_DTYPE = np.dtype([("time", "<i8"), ("product", "<i8"), ("formed", "<i8")])
+EVENT_DTYPE = np.dtype([("kind", "u1"), ("enzyme", "<i4"), ("x", "<f4"), ("y", "<f4")])
+
+
+def _chunk_file(path, name, chunk):
+    return os.path.join(path, f"{name}_{chunk:05d}.npy")
+
+
+class TrajectoryRecorder:
+    """
+    Stream the particle trajectory of a spatial simulation to disk.
+
+    Attach with sim.recorder = TrajectoryRecorder(path, sim); step_simulation
+    then calls record() after every step. Call close() to flush the last chunk.
+    """
+
+    def __init__(self, path, sim, chunk_steps=500, quantize=True):
+        self.path = path
+        self.chunk_steps = int(chunk_steps)
+        self.quantize = quantize
+        self.width, self.height = sim.width, sim.height
+        os.makedirs(path, exist_ok=True)
+
+        self.meta = {
+            "width": sim.width,
+            "height": sim.height,
+            "chunk_steps": self.chunk_steps,
+            "quantize": quantize,
+            "start_time": int(sim.time),
+            "steps": 0,
+            "sample_interval": sim.sample_interval,
+            "model": model_name(sim.kinetic_model),
+            "seed": str(sim.seed),
+            "environment": dict(sim.environment),
+            "enzyme_count": sim.enzyme_count,
+            "substrate_count": sim.substrate_count,
+            "inhibitor_count": sim.inhibitor_count,
+            "explicit_inhibitors": sim.explicit_inhibitors,
+            "product_sink": sim.product_sink,
+            "default_km": sim.default_km,
+            "default_optimal_temp": sim.default_optimal_temp,
+            "default_optimal_pH": sim.default_optimal_pH,
+        }
+        self._chunk = 0
+        self._reset_buffers()
+
+        # The initial state is step 0 of the recording
+        self.record(sim)
+
+    def _reset_buffers(self):
+        self._positions = []
+        self._species = []
+        self._counts = []
+        self._steps = []
+        self._events = []
+        self._event_counts = []
+
+    def _encode(self, xy):
+        if not self.quantize:
+            return xy.astype("<f4")
+        return quantize_positions(xy, self.width, self.height)
+
+    def record(self, sim, bound=None, released=None):
+        """
+        Append the current state of `sim`. `bound` and `released` are the
+        enzyme indices that bound a substrate / released a product this step.
+        """
+        enzymes = sim.enzyme_store
+        substrates = sim.substrate_store
+        products = sim.product_store
+        inhibitors = sim.inhibitor_store
+
+        xy = np.concatenate((
+            np.column_stack((enzymes.x, enzymes.y)),
+            np.column_stack((substrates.x, substrates.y)),
+            np.column_stack((products.x, products.y)),
+            np.column_stack((inhibitors.x, inhibitors.y)),
+        ))
+        species = np.concatenate((
+            np.where(enzymes.state, COMPLEX, ENZYME).astype(np.uint8),
+            np.full(len(substrates), SUBSTRATE, dtype=np.uint8),
+            np.full(len(products), PRODUCT, dtype=np.uint8),
+            np.full(len(inhibitors), INHIBITOR, dtype=np.uint8),
+        ))
+        self._positions.append(self._encode(xy))
+        self._species.append(species)
+        self._counts.append(len(species))
+
+        formed = len(released) if released is not None else 0
+        self._steps.append((sim.time, sim.product_total, formed))
+
+        events = []
+        for kind, idx in ((BIND, bound), (CATALYSIS, released)):
+            if idx is None or len(idx) == 0:
+                continue
+            block = np.empty(len(idx), dtype=EVENT_DTYPE)
+            block["kind"] = kind
+            block["enzyme"] = idx
+            block["x"] = enzymes.x[idx]
+            block["y"] = enzymes.y[idx]
+            events.append(block)
+        events = np.concatenate(events) if events else np.empty(0, dtype=EVENT_DTYPE)
+        self._events.append(events)
+        self._event_counts.append(len(events))
+
+        self.meta["steps"] += 1
+        if len(self._counts) == self.chunk_steps:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered steps as one chunk (no-op when empty)."""
+        if not self._counts:
+            return
+        path, chunk = self.path, self._chunk
+        np.save(_chunk_file(path, "positions", chunk), np.concatenate(self._positions))
+        np.save(_chunk_file(path, "species", chunk), np.concatenate(self._species))
+        np.save(_chunk_file(path, "offsets", chunk), np.concatenate(([0], np.cumsum(self._counts))).astype("<i8"))
+        np.save(_chunk_file(path, "steps", chunk), np.array(self._steps, dtype=STEP_DTYPE))
+        np.save(_chunk_file(path, "events", chunk), np.concatenate(self._events))
+        np.save(_chunk_file(path, "event_offsets", chunk), np.concatenate(([0], np.cumsum(self._event_counts))).astype("<i8"))
+
+        self._chunk += 1
+        self._reset_buffers()
+        self._write_meta()
+
+    def _write_meta(self):
+        # Only fully written chunks are announced to readers
+        self.meta["chunks"] = self._chunk
+        self.meta["flushed_steps"] = self.meta["steps"] - len(self._counts)
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def close(self):
+        self.flush()
+        self._write_meta()
+
+
+class TrajectoryReader:
+    """Random-access reader for a recording made by TrajectoryRecorder."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.chunk_steps = self.meta["chunk_steps"]
+        self.start_time = self.meta["start_time"]
+        self.n_steps = self.meta["flushed_steps"]
+        self._maps = {}
+
+    def __len__(self):
+        return self.n_steps
+
+    @property
+    def times(self):
+        return np.arange(self.start_time, self.start_time + self.n_steps)
+
+    def _load(self, name, chunk):
+        key = (name, chunk)
+        if key not in self._maps:
+            self._maps[key] = np.load(_chunk_file(self.path, name, chunk), mmap_mode="r")
+        return self._maps[key]
+
+    def _locate(self, time):
+        k = int(time) - self.start_time
+        if not 0 <= k < self.n_steps:
+            raise IndexError(f"time {time} is not in the recording "
+                             f"({self.start_time}..{self.start_time + self.n_steps - 1})")
+        return divmod(k, self.chunk_steps)
+
+    def frame(self, time):
+        """Return (positions (M, 2) float, species codes (M,)) at simulation time `time`."""
+        chunk, i = self._locate(time)
+        offsets = self._load("offsets", chunk)
+        start, stop = offsets[i], offsets[i + 1]
+        xy = np.asarray(self._load("positions", chunk)[start:stop], dtype=float)
+        if self.meta["quantize"]:
+            xy = dequantize_positions(xy, self.meta["width"], self.meta["height"])
+        return xy, np.asarray(self._load("species", chunk)[start:stop])
+
+    def events(self, time):
+        """Bind / catalysis events recorded at simulation time `time`."""
+        chunk, i = self._locate(time)
+        offsets = self._load("event_offsets", chunk)
+        return np.asarray(self._load("events", chunk)[offsets[i]:offsets[i + 1]])
+
+    def steps(self, until=None):
+        """Per-step (time, product, formed) records from the start up to time `until` (inclusive)."""
+        last_chunk, last_i = self._locate(until if until is not None else self.start_time + self.n_steps - 1)
+        parts = [self._load("steps", c) for c in range(last_chunk)]
+        parts.append(self._load("steps", last_chunk)[:last_i + 1])
+        return np.concatenate(parts)
+
+    def snapshots(self, start=None, stop=None, stride=1):
+        """Return the recorded frames between `start` and `stop` as Snapshots for replay."""
+        start = self.start_time if start is None else start
+        stop = self.start_time + self.n_steps if stop is None else stop
+        snaps = Snapshots(self.meta["width"], self.meta["height"], stride)
+        for time in range(start, stop, snaps.stride):
+            xy, species = self.frame(time)
+            snaps.times.append(time)
+            snaps.frames.append({
+                "enzyme": xy[(species == ENZYME) | (species == COMPLEX)].astype(np.float32),
+                "substrate": xy[species == SUBSTRATE].astype(np.float32),
+                "product": xy[species == PRODUCT].astype(np.float32),
+                "complex": xy[species == COMPLEX].astype(np.float32),
+                "inhibitor": xy[species == INHIBITOR].astype(np.float32),
+            })
+        return snaps
+
+    def to_state(self, time, model=None):
+        """Rebuild a SimulationState at simulation time `time` for replay or analysis."""
+        meta = self.meta
+        sim = SimulationState(model if model is not None else get_model(meta["model"]))
+        sim.width, sim.height = meta["width"], meta["height"]
+        sim.sample_interval = meta["sample_interval"]
+        sim.enzyme_count = meta["enzyme_count"]
+        sim.substrate_count = meta["substrate_count"]
+        sim.inhibitor_count = meta["inhibitor_count"]
+        sim.explicit_inhibitors = meta.get("explicit_inhibitors", False)
+        sim.product_sink = meta.get("product_sink")
+        sim.default_km = meta["default_km"]
+        sim.default_optimal_temp = meta["default_optimal_temp"]
+        sim.default_optimal_pH = meta["default_optimal_pH"]
+        sim.update_environment(meta["environment"])
+
+        # --- Particles ---
+        xy, species = self.frame(time)
+        is_enzyme = (species == ENZYME) | (species == COMPLEX)
+        sim.enzyme_store.clear()
+        sim.enzyme_store.add(
+            xy[is_enzyme, 0], xy[is_enzyme, 1],
+            state=(species[is_enzyme] == COMPLEX).astype(np.int8),
+            km=sim.default_km,
+            optimal_temp=sim.default_optimal_temp,
+            optimal_pH=sim.default_optimal_pH
+        )
+        sim.substrate_store.clear()
+        sim.substrate_store.add(xy[species == SUBSTRATE, 0], xy[species == SUBSTRATE, 1])
+        sim.product_store.clear()
+        sim.product_store.add(xy[species == PRODUCT, 0], xy[species == PRODUCT, 1], born=time)
+        sim.inhibitor_store.clear()
+        sim.inhibitor_store.add(xy[species == INHIBITOR, 0], xy[species == INHIBITOR, 1])
+
+        # --- Histories (replayed through record_step so sampled stats match) ---
+        steps = self.steps(until=time)
+        sim.time = int(steps["time"][0])
+        sim.step_counter = sim.time
+        for product, formed in zip(steps["product"][1:], steps["formed"][1:]):
+            sim.record_step(int(formed), product_total=int(product))
+
+        # Products beyond the recorded particles were in the sink
+        sim.products_sunk = int(steps["product"][-1]) - len(sim.product_store)
+        return sim
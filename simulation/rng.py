@@ -0,0 +1,42 @@
+# simulation/rng.py
+import numpy as np
+
+class RandomBuffer:
+    """
+    Serve uniform [0, 1) numbers from blocks pre-drawn with one Generator call.
+
+    Consumers ask for all the numbers a phase needs at once; the buffer is
+    refilled with `block_size` draws when it runs dry, so the per-step
+    overhead is a slice rather than a Generator call. The sequence served
+    depends only on the Generator's seed, so runs replay exactly.
+    """
+
+    def __init__(self, rng, block_size=65536):
+        self.rng = rng
+        self.block_size = block_size
+        self._block = np.empty(0)
+        self._pos = 0
+
+    def random(self, n):
+        """Return the next n uniform [0, 1) numbers as an array."""
+        n = int(n)
+        available = len(self._block) - self._pos
+        if n <= available:
+            out = self._block[self._pos:self._pos + n]
+            self._pos += n
+            return out
+
+        # Use what is left, then refill (or draw directly for very large requests)
+        head = self._block[self._pos:]
+        need = n - available
+        if need > self.block_size:
+            self._block = np.empty(0)
+            self._pos = 0
+            return np.concatenate((head, self.rng.random(need)))
+        self._block = self.rng.random(self.block_size)
+        self._pos = need
+        return np.concatenate((head, self._block[:need]))
+
+    def uniform(self, low, high, n):
+        """Return the next n numbers scaled to [low, high)."""
+        return low + (high - low) * self.random(n)
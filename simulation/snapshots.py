@@ -0,0 +1,59 @@
+# simulation/snapshots.py
+import numpy as np
+
+# Species recorded in every snapshot, in drawing order
+SPECIES = ("enzyme", "substrate", "product", "complex", "inhibitor")
+
+# Compact positions: fractions of the box in uint16 (4 bytes per particle)
+POSITION_QUANT = np.iinfo(np.uint16).max
+
+
+def quantize_positions(xy, width, height):
+    """(N, 2) positions in the width x height box as little-endian uint16 box fractions."""
+    scale = np.array([width, height], dtype=float)
+    return np.round(np.clip(xy / scale, 0, 1) * POSITION_QUANT).astype("<u2")
+
+
+def dequantize_positions(q, width, height):
+    """Inverse of quantize_positions (to within half a quantization step)."""
+    return np.asarray(q, dtype=float) / POSITION_QUANT * np.array([width, height], dtype=float)
+
+
+def species_positions(sim):
+    """Return {species: (N, 2) positions} for every species in SPECIES."""
+    enzymes = sim.enzyme_store
+    bound = enzymes.state.astype(bool)
+    return {
+        "enzyme": np.column_stack((enzymes.x, enzymes.y)),
+        "substrate": np.column_stack((sim.substrate_store.x, sim.substrate_store.y)),
+        "product": np.column_stack((sim.product_store.x, sim.product_store.y)),
+        "complex": np.column_stack((enzymes.x[bound], enzymes.y[bound])),
+        "inhibitor": np.column_stack((sim.inhibitor_store.x, sim.inhibitor_store.y)),
+    }
+
+
+class Snapshots:
+    """Compact particle snapshots (float32 positions per species) taken every `stride` steps."""
+
+    def __init__(self, width, height, stride=1):
+        self.width = width
+        self.height = height
+        self.stride = max(int(stride), 1)
+        self.times = []
+        self.frames = []
+
+    def __len__(self):
+        return len(self.frames)
+
+    def due(self, sim):
+        return sim.time % self.stride == 0
+
+    def add(self, sim):
+        """Record the current particle positions of `sim`."""
+        self.times.append(int(sim.time))
+        self.frames.append({
+            species: xy.astype(np.float32) for species, xy in species_positions(sim).items()
+        })
+
+    def __iter__(self):
+        return iter(zip(self.times, self.frames))
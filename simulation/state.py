@@ -1,11 +1,20 @@
 import numpy as np
 from models.enzyme import Enzyme
 from models.substrate import Substrate
+from models.product import Product
+from models.inhibitor import Inhibitor
+from models.complex import ESComplex
+from simulation.rng import RandomBuffer
+from simulation.history import HistoryBuffer, RunningStats
+from kinetics.modifiers import ActivityCache
 
 class SimulationState:
-    def __init__(self, model):
+    def __init__(self, model, seed=None):
         self.model = model
 
+        # --- Random numbers: one Generator per simulation, from a recorded seed ---
+        self.seed_rng(seed)
+
         # --- Environment ---
         self.environment = {"temperature": 37, "pH": 7.0}
         self.kinetic_model = model
@@ -14,6 +23,7 @@ class SimulationState:
         self.enzyme_count = 10
         self.substrate_count = 100
         self.inhibitor_count = 0
+        self.explicit_inhibitors = False  # simulate inhibitors as particles (spatial engine)
 
         # --- Simulation space ---
         self.width = 200
@@ -24,68 +34,218 @@ class SimulationState:
         self.step_counter = 0
         self.sample_interval = 50  # sample every 50 steps
 
-        # --- Particles ---
-        self.enzymes = []
-        self.substrates = []
-        self.products = []
-        self.complexes = []
+        # --- Particles (struct-of-arrays, one store per species) ---
+        self.enzyme_store = Enzyme.make_store()
+        self.substrate_store = Substrate.make_store()
+        self.product_store = Product.make_store()
+        self.inhibitor_store = Inhibitor.make_store()
+
+        # --- Product sink: keep only the newest N products as particles (None = keep all) ---
+        self.product_sink = None
+        self.products_sunk = 0  # products counted but no longer simulated
 
-        # --- History tracking ---
-        self.time_history = []
-        self.product_history = []
-        self.rate_history = []
+        # --- History tracking (NumPy buffers; history_cap keeps only the last N steps) ---
+        self.history_cap = None
+        self.time_history = HistoryBuffer(np.int64, maxlen=self.history_cap)
+        self.product_history = HistoryBuffer(np.int64, maxlen=self.history_cap)
+        self.rate_history = HistoryBuffer(np.int64, maxlen=self.history_cap)
 
         # --- Sampled histories for stats ---
-        self.history_time_sampled = []
-        self.history_product_sampled = []
+        self.history_time_sampled = HistoryBuffer(np.int64)
+        self.history_product_sampled = HistoryBuffer(np.int64)
+
+        # --- Running statistics of products per sample interval ---
+        self.interval_stats = RunningStats()
 
         # --- Default enzyme parameters ---
         self.default_km = 0.5
         self.default_optimal_temp = 37
         self.default_optimal_pH = 7.0
 
+        # --- Cached enzyme activity (temperature/pH modifiers) ---
+        self.activity_cache = ActivityCache()
+        self._activity = None
+        self._activity_key = None
+
         # --- Base particle speed ---
         self.base_speed = 1.0
 
+        # --- Engine: "spatial" (2-D particles), "well_mixed" (Gillespie / tau-leaping)
+        #     or "mean_field" (deterministic ODE limit) ---
+        self.engine = "spatial"
+        self.counts = None  # species counts {"E", "S", "ES", "P"} for the non-spatial engines
+
+        # --- Optional trajectory recorder (see simulation/recorder.py) ---
+        self.recorder = None
+
+        # --- Optional phase profiler (see simulation/profiling.py) ---
+        self.profiler = None
+
         # --- Initialize particles ---
         self.initialize_particles()
 
+    # ---------------------------------------------------
+    # Random number streams
+    # ---------------------------------------------------
+    def seed_rng(self, seed=None):
+        """
+        (Re)create the simulation's Generator. With seed=None a fresh seed
+        is drawn from OS entropy; either way it is kept in self.seed so the
+        run can be replayed bit-for-bit.
+        """
+        self.seed = np.random.SeedSequence().entropy if seed is None else int(seed)
+        self._seed_sequence = np.random.SeedSequence(self.seed)
+        self.rng = np.random.default_rng(self._seed_sequence)
+        self.random = RandomBuffer(self.rng)
+
+    def spawn_rngs(self, n):
+        """Return n independent child Generators (e.g. one per worker or replica batch)."""
+        return [np.random.default_rng(child) for child in self._seed_sequence.spawn(n)]
+
+    # ---------------------------------------------------
+    # Object views (compatibility with the per-particle API)
+    # ---------------------------------------------------
+    @property
+    def enzymes(self):
+        return self.enzyme_store.views(Enzyme)
+
+    @property
+    def substrates(self):
+        return self.substrate_store.views(Substrate)
+
+    @property
+    def products(self):
+        return self.product_store.views(Product)
+
+    @property
+    def complexes(self):
+        bound = np.flatnonzero(self.enzyme_store.state)
+        return [ESComplex(Enzyme.view(self.enzyme_store, i)) for i in bound]
+
+    # ---------------------------------------------------
+    # Species totals (independent of the engine in use)
+    # ---------------------------------------------------
+    @property
+    def enzyme_total(self):
+        if self.counts is not None:
+            return self.counts["E"] + self.counts["ES"]
+        return len(self.enzyme_store)
+
+    @property
+    def substrates_remaining(self):
+        if self.counts is not None:
+            return self.counts["S"]
+        return len(self.substrate_store)
+
+    @property
+    def product_total(self):
+        if self.counts is not None:
+            return self.counts["P"]
+        return len(self.product_store) + self.products_sunk
+
     def initialize_particles(self):
         """Create enzyme and substrate particles with random positions."""
 
+        self.products_sunk = 0
+
+        # --- Well-mixed and mean-field engines: counts only, no particles ---
+        if self.engine in ("well_mixed", "mean_field"):
+            self.enzyme_store.clear()
+            self.substrate_store.clear()
+            self.product_store.clear()
+            self.inhibitor_store.clear()
+            self.counts = {"E": self.enzyme_count, "S": self.substrate_count, "ES": 0, "P": 0}
+            return
+        self.counts = None
+
         # --- Enzymes ---
-        self.enzymes = [
-            Enzyme(
-                x=np.random.uniform(0, self.width),
-                y=np.random.uniform(0, self.height),
-                km=self.default_km,
-                optimal_temp=self.default_optimal_temp,
-                optimal_pH=self.default_optimal_pH
-            )
-            for _ in range(self.enzyme_count)
-        ]
+        self.enzyme_store.clear()
+        self.enzyme_store.add(
+            x=self.random.uniform(0, self.width, self.enzyme_count),
+            y=self.random.uniform(0, self.height, self.enzyme_count),
+            km=self.default_km,
+            optimal_temp=self.default_optimal_temp,
+            optimal_pH=self.default_optimal_pH
+        )
 
         # --- Substrates ---
-        self.substrates = [
-            Substrate(
-                x=np.random.uniform(0, self.width),
-                y=np.random.uniform(0, self.height)
+        self.substrate_store.clear()
+        self.substrate_store.add(
+            x=self.random.uniform(0, self.width, self.substrate_count),
+            y=self.random.uniform(0, self.height, self.substrate_count)
+        )
+
+        # --- Inhibitor particles (only with explicit_inhibitors) ---
+        self.inhibitor_store.clear()
+        if self.explicit_inhibitors:
+            self.inhibitor_store.add(
+                x=self.random.uniform(0, self.width, self.inhibitor_count),
+                y=self.random.uniform(0, self.height, self.inhibitor_count)
             )
-            for _ in range(self.substrate_count)
-        ]
 
-        # --- Reset products and complexes ---
-        self.products = []
-        self.complexes = []
+        # --- Reset products (complexes are bound enzymes) ---
+        self.product_store.clear()
+
+    def reset(self, seed=None):
+        """
+        Re-generate particles and clear time and histories (parameters are kept).
+        Pass the seed of an earlier run to replay it; by default a new seed is drawn.
+        """
+        self.seed_rng(seed)
+        self.initialize_particles()
+        self.time = 0
+        self.step_counter = 0
+        self.time_history = HistoryBuffer(np.int64, maxlen=self.history_cap)
+        self.product_history = HistoryBuffer(np.int64, maxlen=self.history_cap)
+        self.rate_history = HistoryBuffer(np.int64, maxlen=self.history_cap)
+        self.history_time_sampled = HistoryBuffer(np.int64)
+        self.history_product_sampled = HistoryBuffer(np.int64)
+        self.interval_stats = RunningStats()
+
+    def record_step(self, products_formed, product_total=None):
+        """
+        Advance time by one step and append to the per-step and sampled histories.
+        product_total defaults to the current product count.
+        """
+        if product_total is None:
+            product_total = self.product_total
+
+        self.time += 1
+        self.time_history.append(self.time)
+        self.product_history.append(product_total)
+        self.rate_history.append(products_formed)  # per-step production
+
+        # --- Sampling every N steps for statistics ---
+        self.step_counter += 1
+        if self.step_counter % self.sample_interval == 0:
+            previous = self.history_product_sampled[-1] if len(self.history_product_sampled) else 0
+            self.history_time_sampled.append(self.time)
+            self.history_product_sampled.append(product_total)
+            self.interval_stats.update(product_total - previous)
+
+    def enzyme_activity(self):
+        """
+        Per-enzyme activity array, recomputed only when the enzymes or the
+        environment change.
+        """
+        key = (self.enzyme_store.version, self.environment["temperature"], self.environment["pH"])
+        if key != self._activity_key:
+            self._activity = self.activity_cache.activity(self.enzyme_store, self.environment)
+            self._activity_key = key
+        return self._activity
 
     def update_environment(self, config):
         """
         Update environment and enzyme parameters from controls.
         config = dict from tab_controls
         """
-        # Update temperature and pH
-        self.environment["temperature"] = config.get("temperature", 37)
-        self.environment["pH"] = config.get("pH", 7.0)
+        # Update temperature and pH (cached activities are stale once either changes)
+        temperature = config.get("temperature", 37)
+        pH = config.get("pH", 7.0)
+        if (temperature, pH) != (self.environment["temperature"], self.environment["pH"]):
+            self.activity_cache.invalidate()
+        self.environment["temperature"] = temperature
+        self.environment["pH"] = pH
 
         # Update default enzyme properties
         self.default_km = config.get("km", self.default_km)
@@ -0,0 +1,38 @@
+# simulation/termination.py
+import numpy as np
+
+# --- Default stop rules ---
+PLATEAU_THRESHOLD = 1   # minimal products per interval
+PLATEAU_INTERVALS = 2   # consecutive low-activity intervals
+MAX_STEPS = 100_000     # safety cap for runs that never meet a stop rule
+
+def plateau_reached(sim, threshold=PLATEAU_THRESHOLD, intervals=PLATEAU_INTERVALS):
+    """True once the last `intervals` sampled intervals each produced <= threshold products."""
+    if len(sim.history_product_sampled) < intervals + 1:
+        return False
+    recent = sim.history_product_sampled[-(intervals + 1):]
+    return bool((np.diff(recent) <= threshold).all())
+
+def substrates_exhausted(sim):
+    """True once every substrate has been consumed."""
+    return sim.substrates_remaining == 0
+
+def stop_reason(sim, threshold=PLATEAU_THRESHOLD, intervals=PLATEAU_INTERVALS, max_steps=None):
+    """
+    Return why the simulation should stop ("plateau", "exhausted" or
+    "max_steps"), or None if it should keep running.
+    """
+    if plateau_reached(sim, threshold, intervals):
+        return "plateau"
+    if substrates_exhausted(sim):
+        return "exhausted"
+    if max_steps is not None and sim.time >= max_steps:
+        return "max_steps"
+    return None
+
+# --- User-facing messages for each stop reason ---
+STOP_MESSAGES = {
+    "plateau": "Simulation finished: product formation plateau reached.",
+    "exhausted": "Simulation finished: all substrates consumed.",
+    "max_steps": "Simulation stopped: step limit reached.",
+}
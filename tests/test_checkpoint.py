@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pytest
+
+from kinetics.registry import get_model
+from simulation.checkpoint import MAGIC, checkpoint_bytes, fork, load_checkpoint, save_checkpoint
+from simulation.engine import step_simulation
+from simulation.state import SimulationState
+
+
+def _large_unstepped_state():
+    # 200k substrates are drawn straight from the Generator, so the RandomBuffer block is still empty
+    sim = SimulationState(get_model("none"), seed=1)
+    sim.substrate_count = 200_000
+    sim.initialize_particles()
+    assert len(sim.random._block) == 0
+    return sim
+
+
+def _run(sim, steps=3):
+    for _ in range(steps):
+        step_simulation(sim)
+    return sim.product_history.tolist(), sim.substrates_remaining
+
+
+def _edit_header(data, edit):
+    """Checkpoint bytes with the JSON header changed in place by edit(header)."""
+    start = len(MAGIC) + 8
+    size = int(np.frombuffer(data[len(MAGIC):start], dtype=np.uint64)[0])
+    header = json.loads(data[start:start + size])
+    edit(header)
+    encoded = json.dumps(header).encode()
+    assert len(encoded) <= size
+    return data[:start] + encoded.ljust(size) + data[start + size:]
+
+
+def test_round_trip_with_empty_arrays(tmp_path):
+    path = tmp_path / "empty_block.ckpt"
+    save_checkpoint(_large_unstepped_state(), path)
+    expected = _run(_large_unstepped_state())
+
+    assert _run(load_checkpoint(path)) == expected
+    assert _run(load_checkpoint(path, mmap=False)) == expected
+    assert _run(load_checkpoint(path.read_bytes())) == expected
+    assert [_run(branch) for branch in fork(_large_unstepped_state(), branches=2)] == [expected] * 2
+
+
+@pytest.mark.parametrize("edit", [
+    lambda h: h["state"].update(kinetic_model=None),
+    lambda h: h["model_parameters"].update(binding_modifier=0),
+    lambda h: h["stores"]["substrate_store"].update(n=10**9),
+    lambda h: h["histories"]["time_history"].update(count=10**9, maxlen=None),
+    lambda h: h["arrays"]["substrate_store._x"].update(offset=10**12),
+    lambda h: h["arrays"]["enzyme_store._y"].update(used=10**6),
+    lambda h: h["arrays"]["enzyme_store._x"].update(dtype="|O"),
+    lambda h: h["arrays"]["random.block"].update(used=0, length=4 * 10**9),
+    lambda h: h["state"].update(engine="bogus"),
+    lambda h: h["state"].update(width="200"),
+    lambda h: h["state"].update(sample_interval=0),
+    lambda h: h["state"].update(environment={"temperature": None, "pH": 7.0}),
+    lambda h: h.pop("random"),
+])
+def test_rejects_inconsistent_headers(edit):
+    sim = SimulationState(get_model("competitive"), seed=2)
+    sim.initialize_particles()
+    _run(sim)
+    data = _edit_header(checkpoint_bytes(sim), edit)
+    with pytest.raises(ValueError, match="Corrupt checkpoint"):
+        load_checkpoint(data)
@@ -0,0 +1,204 @@
+# ui/animation.py
+"""
+Client-side particle animation.
+
+The server records compact frames (quantized positions plus a species
+code per particle) and ships them once to a small canvas player in the
+browser, which plays, pauses and scrubs locally. No per-frame images
+are encoded on the server.
+"""
+
+import base64
+import json
+
+import numpy as np
+import streamlit.components.v1 as components
+
+from simulation.snapshots import POSITION_QUANT, quantize_positions
+from ui.visualization import SPECIES_STYLES, species_positions
+
+# Species codes follow the drawing order of SPECIES_STYLES
+SPECIES_CODES = {species: code for code, species in enumerate(SPECIES_STYLES)}
+
+
+class FrameBuffer:
+    """Accumulate compact particle frames: uint16 positions, uint8 species codes, per-frame offsets."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.positions = []
+        self.types = []
+        self.counts = []
+        self.times = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, sim):
+        """Record the current particle positions of `sim` as one frame."""
+        self.add_positions(species_positions(sim), sim.time)
+
+    def add_snapshots(self, snapshots):
+        """Record every frame of a simulation.snapshots.Snapshots recording."""
+        for time, positions in snapshots:
+            self.add_positions(positions, time)
+
+    def add_positions(self, positions, time):
+        """Record one frame from {species: (N, 2) positions}."""
+        xy = np.concatenate([positions[s] for s in SPECIES_STYLES])
+        codes = np.concatenate([
+            np.full(len(positions[s]), SPECIES_CODES[s], dtype=np.uint8) for s in SPECIES_STYLES
+        ])
+
+        self.positions.append(quantize_positions(xy, self.width, self.height))
+        self.types.append(codes)
+        self.counts.append(len(codes))
+        self.times.append(int(time))
+
+    def payload(self):
+        """Return the JSON-serializable frame payload for the browser player."""
+        positions = np.concatenate(self.positions) if self.positions else np.empty((0, 2), "<u2")
+        types = np.concatenate(self.types) if self.types else np.empty(0, np.uint8)
+        offsets = np.concatenate(([0], np.cumsum(self.counts))).astype("<i4")
+
+        def b64(arr):
+            return base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode("ascii")
+
+        return {
+            "width": self.width,
+            "height": self.height,
+            "quant": POSITION_QUANT,
+            "positions": b64(positions),
+            "types": b64(types),
+            "offsets": b64(offsets),
+            "times": self.times,
+            "styles": [SPECIES_STYLES[s] for s in SPECIES_STYLES],
+        }
+
+
+_PLAYER_TEMPLATE = """
+<div style="font-family: sans-serif; font-size: 13px;">
+  <canvas id="enz-canvas" style="width: 100%; background: #f0f0f0; border: 1px solid #ccc;"></canvas>
+  <div style="display: flex; gap: 8px; align-items: center; margin-top: 4px;">
+    <button id="enz-play">Pause</button>
+    <input id="enz-scrub" type="range" min="0" value="0" style="flex: 1;">
+    <select id="enz-speed">
+      <option value="0.5">0.5x</option>
+      <option value="1" selected>1x</option>
+      <option value="2">2x</option>
+      <option value="4">4x</option>
+      <option value="8">8x</option>
+      <option value="16">16x</option>
+      <option value="32">32x</option>
+    </select>
+    <span id="enz-label" style="min-width: 90px;"></span>
+  </div>
+  <div id="enz-legend" style="margin-top: 4px;"></div>
+</div>
+<script>
+(function () {
+  const data = __PAYLOAD__;
+  const fps = __FPS__;
+
+  function decode(b64, Type) {
+    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+    return new Type(bytes.buffer);
+  }
+  const pos = decode(data.positions, Uint16Array);
+  const types = decode(data.types, Uint8Array);
+  const offsets = decode(data.offsets, Int32Array);
+  const nFrames = data.times.length;
+
+  const canvas = document.getElementById("enz-canvas");
+  const ctx = canvas.getContext("2d");
+  const W = 600, H = Math.round(600 * data.height / data.width);
+  canvas.width = W; canvas.height = H;
+
+  const scrub = document.getElementById("enz-scrub");
+  const label = document.getElementById("enz-label");
+  const playBtn = document.getElementById("enz-play");
+  const speedSel = document.getElementById("enz-speed");
+  scrub.max = Math.max(nFrames - 1, 0);
+
+  document.getElementById("enz-legend").innerHTML = data.styles.map(
+    s => '<span style="color:' + s.color + '; margin-right: 12px;">&#9632; ' + s.label + '</span>'
+  ).join("");
+
+  function marker(shape, x, y, r) {
+    ctx.beginPath();
+    if (shape === "s") {
+      ctx.rect(x - r, y - r, 2 * r, 2 * r);
+    } else if (shape === "^") {
+      ctx.moveTo(x, y - r); ctx.lineTo(x + r, y + r); ctx.lineTo(x - r, y + r); ctx.closePath();
+    } else if (shape === "*") {
+      for (let k = 0; k < 10; k++) {
+        const a = Math.PI / 2 + k * Math.PI / 5, rr = k % 2 ? r / 2.5 : r;
+        ctx.lineTo(x + rr * Math.cos(a), y - rr * Math.sin(a));
+      }
+      ctx.closePath();
+    } else {
+      ctx.arc(x, y, r, 0, 2 * Math.PI);
+    }
+    ctx.fill();
+  }
+
+  function draw(f) {
+    ctx.clearRect(0, 0, W, H);
+    if (!nFrames) return;
+    const start = offsets[f], stop = offsets[f + 1];
+    // Draw species in style order so complexes end up on top
+    data.styles.forEach((style, code) => {
+      ctx.fillStyle = style.color;
+      const r = Math.sqrt(style.size) / 2;
+      for (let i = start; i < stop; i++) {
+        if (types[i] !== code) continue;
+        const x = pos[2 * i] / data.quant * W;
+        const y = H - pos[2 * i + 1] / data.quant * H;
+        marker(style.marker, x, y, r);
+      }
+    });
+    label.textContent = "t = " + data.times[f];
+  }
+
+  let frame = 0, playing = nFrames > 1, last = null, acc = 0;
+  function tick(now) {
+    if (playing) {
+      if (last !== null) acc += (now - last) / 1000 * fps * parseFloat(speedSel.value);
+      const steps = Math.floor(acc);
+      if (steps > 0) {
+        acc -= steps;
+        frame = Math.min(frame + steps, nFrames - 1);
+        scrub.value = frame;
+        draw(frame);
+        if (frame === nFrames - 1) { playing = false; playBtn.textContent = "Play"; }
+      }
+    }
+    last = now;
+    requestAnimationFrame(tick);
+  }
+
+  playBtn.onclick = () => {
+    if (!playing && frame === nFrames - 1) frame = 0;
+    playing = !playing;
+    playBtn.textContent = playing ? "Pause" : "Play";
+  };
+  scrub.oninput = () => { frame = parseInt(scrub.value); draw(frame); };
+
+  playBtn.textContent = playing ? "Pause" : "Play";
+  draw(0);
+  requestAnimationFrame(tick);
+})();
+</script>
+"""
+
+
+def animation_html(frames, fps=20):
+    """Return a self-contained HTML/JS player for a FrameBuffer."""
+    payload = json.dumps(frames.payload())
+    return _PLAYER_TEMPLATE.replace("__PAYLOAD__", payload).replace("__FPS__", str(float(fps)))
+
+
+def render_animation(frames, fps=20, height=420):
+    """Show a FrameBuffer as a browser-side animation component."""
+    components.html(animation_html(frames, fps=fps), height=height)
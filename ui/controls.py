@@ -1,19 +1,30 @@
 import streamlit as st
 
+# Engines selectable per tab, with their display names
+ENGINES = {
+    "spatial": "Spatial (particles)",
+    "well_mixed": "Well-mixed (Gillespie)",
+    "mean_field": "Mean-field (deterministic ODE)",
+}
 
-def tab_controls(label):
+def tab_controls(label, uses_inhibitor=None, overrides=None):
     st.subheader(f"{label} Controls")
 
     col1, col2, col3 = st.columns(3)
 
-    # Defaults (used only for first render)
+    # Defaults (used only for first render, or after the widgets were reset with overrides)
     defaults = {
         "temperature": 37,
         "pH": 7.0,
         "enzyme_count": 10,
         "substrate_count": 100,
-        "inhibitor": 0
+        "inhibitor": 0,
+        "explicit_inhibitors": False,
+        "engine": "spatial",
+        "product_sink": False,
+        "seed": 42
     }
+    defaults.update(overrides or {})
 
     # ---------------------------------------------------
     # Sliders
@@ -48,9 +59,13 @@ def tab_controls(label):
             key=f"substrate_{label}"
         )
 
+    if uses_inhibitor is None:
+        uses_inhibitor = label != "No Inhibitor"
+
     inhibitor = 0
-    if label != "No Inhibitor":
-        with col3:
+    explicit_inhibitors = False
+    with col3:
+        if uses_inhibitor:
             inhibitor = st.slider(
                 "Inhibitor",
                 0, 100,
@@ -58,6 +73,58 @@ def tab_controls(label):
                 key=f"inhibitor_{label}"
             )
 
+            explicit_inhibitors = st.checkbox(
+                "Inhibitor particles (local effect, spatial engine)",
+                value=defaults["explicit_inhibitors"],
+                key=f"explicit_inhibitors_{label}"
+            )
+
+        engine = st.selectbox(
+            "Engine",
+            list(ENGINES),
+            index=list(ENGINES).index(defaults["engine"]),
+            format_func=ENGINES.get,
+            key=f"engine_{label}"
+        )
+
+        playback = st.radio(
+            "Animation",
+            ["live", "client", "fast", "background"],
+            format_func=lambda name: {
+                "live": "Live (server frames)",
+                "client": "Client-side playback",
+                "fast": "Fast-forward (compute, then replay)",
+                "background": "Background worker (tabs run in parallel)",
+            }[name],
+            key=f"playback_{label}"
+        )
+
+        redraw_every = st.select_slider(
+            "Redraw every (steps)",
+            options=["auto", 1, 2, 5, 10, 20],
+            value="auto",
+            key=f"redraw_{label}"
+        )
+
+        seed = st.number_input(
+            "Seed (0 = new random seed each run)",
+            0, 2**31 - 1,
+            value=defaults["seed"],
+            key=f"seed_{label}"
+        )
+
+        product_sink = st.checkbox(
+            "Product sink (only the newest products keep moving)",
+            value=defaults["product_sink"],
+            key=f"product_sink_{label}"
+        )
+
+        profile = st.checkbox(
+            "Profile phases",
+            value=False,
+            key=f"profile_{label}"
+        )
+
     # ---------------------------------------------------
     # Buttons
     # ---------------------------------------------------
@@ -77,6 +144,13 @@ def tab_controls(label):
         "enzyme_count": enzyme_count,
         "substrate_count": substrate_count,
         "inhibitor": inhibitor,
+        "explicit_inhibitors": explicit_inhibitors,
+        "engine": engine,
+        "playback": playback,
+        "redraw_every": None if redraw_every == "auto" else redraw_every,
+        "profile": profile,
+        "product_sink": product_sink,
+        "seed": int(seed) or None,
         "start": st.session_state[start_key],
         "clean": clean_pressed,
     }
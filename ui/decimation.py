@@ -0,0 +1,105 @@
+# ui/decimation.py
+"""
+Incremental M4 decimation of long time series for line plots.
+
+A line drawn into P pixel columns is fixed by the first, last, minimum
+and maximum sample of every column (M4). CurveDecimator keeps those four
+samples per bucket of consecutive samples and folds new samples in as
+they arrive; once there are more than twice the target number of buckets,
+neighbouring buckets merge and the bucket width doubles. A curve never
+has more than about 8 vertices per target bucket however long the run,
+and every update only touches the new samples and the kept buckets.
+"""
+
+import weakref
+
+import numpy as np
+
+
+def _combine(ids, stats):
+    """Merge consecutive rows with equal bucket ids (stats columns: first, min, max, last as x, y pairs)."""
+    starts = np.r_[0, np.flatnonzero(np.diff(ids)) + 1]
+    if len(starts) == len(ids):
+        return ids, stats
+    ends = np.r_[starts[1:], len(ids)]
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+
+    out = np.empty((len(starts), 8))
+    out[:, 0:2] = stats[starts, 0:2]
+    out[:, 6:8] = stats[ends - 1, 6:8]
+    lowest = np.lexsort((stats[:, 3], group))[starts]
+    highest = np.lexsort((-stats[:, 5], group))[starts]
+    out[:, 2:4] = stats[lowest, 2:4]
+    out[:, 4:6] = stats[highest, 4:6]
+    return ids[starts], out
+
+
+class CurveDecimator:
+    """M4 view of a growing (x, y) series with about `buckets` (at most 2 * buckets) buckets."""
+
+    def __init__(self, buckets):
+        self.buckets = max(int(buckets), 1)
+        self.width = 1   # samples per bucket
+        self.seen = 0    # samples folded in so far
+        self.ids = np.empty(0, dtype=np.int64)
+        self.stats = np.empty((0, 8))
+
+    def update(self, x, y, start=0):
+        """Fold in samples x, y, the first of which is sample number `start`; already seen samples are skipped."""
+        skip = max(self.seen - start, 0)
+        x = np.asarray(x, dtype=float)[skip:]
+        y = np.asarray(y, dtype=float)[skip:]
+        if len(x) == 0:
+            return
+        index = start + skip + np.arange(len(x))
+        self.seen = int(index[-1]) + 1
+
+        rows = np.tile(np.column_stack((x, y)), 4)
+        self.ids, self.stats = _combine(
+            np.concatenate((self.ids, index // self.width)),
+            np.concatenate((self.stats, rows))
+        )
+        while len(self.ids) > 2 * self.buckets:
+            self.width *= 2
+            self.ids, self.stats = _combine(self.ids // 2, self.stats)
+
+    def trim(self, x_min):
+        """Drop buckets that end before x_min (for ring-buffer histories)."""
+        keep = self.stats[:, 6] >= x_min
+        self.ids, self.stats = self.ids[keep], self.stats[keep]
+
+    def vertices(self):
+        """(x, y) arrays to plot, in x order."""
+        if self.width == 1:
+            return self.stats[:, 0], self.stats[:, 1]
+        xs, ys = self.stats[:, 0::2], self.stats[:, 1::2]
+        order = np.argsort(xs, axis=1, kind="stable")
+        return np.take_along_axis(xs, order, 1).ravel(), np.take_along_axis(ys, order, 1).ravel()
+
+
+# Decimators per (x, y, buckets), fed incrementally on every redraw: x -> y -> {buckets: decimator}
+_decimators = weakref.WeakKeyDictionary()
+MAX_WIDTHS = 4  # bucket counts (figure widths) kept per curve
+
+
+def decimated(x, y, buckets):
+    """
+    Decimated (x, y) vertices of two HistoryBuffers appended in lock-step,
+    e.g. sim.time_history and sim.product_history.
+    """
+    buckets = max(int(buckets), 1)
+    by_width = _decimators.setdefault(x, weakref.WeakKeyDictionary()).setdefault(y, {})
+    decimator = by_width.get(buckets)
+    if decimator is None or x.count < decimator.seen:
+        decimator = CurveDecimator(buckets)
+    # Most recently used width last; the oldest goes once too many are kept
+    by_width.pop(buckets, None)
+    by_width[buckets] = decimator
+    if len(by_width) > MAX_WIDTHS:
+        del by_width[next(iter(by_width))]
+
+    n = len(x)
+    decimator.update(x.values, y.values[:n], x.count - n)
+    if x.maxlen is not None and n:
+        decimator.trim(x.values[0])
+    return decimator.vertices()
@@ -1,47 +1,158 @@
+import weakref
+
 import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
 
+from simulation.history import HistoryBuffer
+from ui.decimation import decimated
+
+# Stats and progress tables per simulation, rebuilt only when a new sample arrives
+_table_cache = weakref.WeakKeyDictionary()
+
+# Product line of each reused figure (updated in place instead of re-plotted)
+_product_lines = weakref.WeakKeyDictionary()
+
+
+def _pixel_columns(ax):
+    """Width of the axes in pixels: the decimation target for its curves."""
+    return max(int(ax.get_window_extent().width), 100)
+
+
+def _curve(ax, x, y):
+    """Vertices to draw for x, y; HistoryBuffers are M4-decimated to the axes' pixel width."""
+    if isinstance(x, HistoryBuffer):
+        return decimated(x, y, _pixel_columns(ax))
+    return x, y
+
+
 def render_plot_and_table(sim, fig=None):
     """Plot product vs time and compute statistics over sampled intervals."""
 
-    # --- Create or reuse figure ---
+    # --- Create or reuse figure (and its product line) ---
     if fig is None:
         fig, ax = plt.subplots(figsize=(6, 4))
-    else:
+    line = _product_lines.get(fig)
+    if line is None:
         ax = fig.axes[0] if fig.axes else fig.add_subplot(111)
         ax.clear()
+        line, = ax.plot([], [], color="green")
+        ax.set_xlabel("Time")
+        ax.set_ylabel("Product")
+        ax.set_title("Product vs Time")
+        ax.grid(True)
+        _product_lines[fig] = line
+    ax = line.axes
 
-    # --- Plot product vs time ---
-    ax.plot(sim.time_history, sim.product_history, color="green")
-    ax.set_xlabel("Time")
-    ax.set_ylabel("Product")
-    ax.set_title("Product vs Time")
-    ax.grid(True)
+    # --- Plot product vs time (decimated: constant vertex count however long the run) ---
+    line.set_data(*_curve(ax, sim.time_history, sim.product_history))
+    ax.relim()
+    ax.autoscale_view()
+
+    # --- Tables only change when a sample interval completes ---
+    sampled = sim.history_product_sampled
+    cached = _table_cache.get(sim)
+    if cached is not None and cached[0] is sampled and cached[1] == sampled.count:
+        return fig, cached[2], cached[3]
 
-    # --- Create raw time-course dataframe (THIS IS NEW) ---
+    # --- Raw time-course dataframe (views of the sampled history buffers) ---
     df_progress = pd.DataFrame({
-        "Time": sim.history_time_sampled,
-        "Product": sim.history_product_sampled
-    })
-
-    # --- Compute statistics for sampled intervals ---
-    if sim.history_product_sampled:
-        interval_production = np.diff([0] + sim.history_product_sampled)
-
-        stats = {
-            "Min": np.min(interval_production),
-            "Mean": np.mean(interval_production),
-            "Std Dev": np.std(interval_production),
-            "Max": np.max(interval_production)
-        }
-
-        df_stats = pd.DataFrame(stats, index=["Products per 50 steps"])
+        "Time": sim.history_time_sampled.values,
+        "Product": sim.history_product_sampled.values
+    }, copy=False)
+
+    # --- Statistics for sampled intervals (running Welford accumulator) ---
+    stats = sim.interval_stats
+    if stats.count:
+        df_stats = pd.DataFrame({
+            "Min": [stats.min],
+            "Mean": [stats.mean],
+            "Std Dev": [stats.std],
+            "Max": [stats.max]
+        }, index=["Products per 50 steps"])
     else:
         df_stats = pd.DataFrame(
             {"Min": [0], "Mean": [0], "Std Dev": [0], "Max": [0]},
             index=["Products per 50 steps"]
         )
 
+    _table_cache[sim] = (sampled, sampled.count, df_stats, df_progress)
+
     # --- Return THREE objects now ---
     return fig, df_stats, df_progress
+
+
+def render_ensemble_plot(summary, fig=None):
+    """Plot the mean product curve of an ensemble with its confidence and spread bands."""
+
+    # --- Create or reuse figure ---
+    if fig is None:
+        fig, ax = plt.subplots(figsize=(6, 4))
+    else:
+        ax = fig.axes[0] if fig.axes else fig.add_subplot(111)
+        ax.clear()
+
+    ax.fill_between(summary["Time"], summary["Band Low"], summary["Band High"],
+                    color="green", alpha=0.15, label="Replica spread")
+    ax.fill_between(summary["Time"], summary["CI Low"], summary["CI High"],
+                    color="green", alpha=0.4, label="CI of mean")
+    ax.plot(summary["Time"], summary["Mean"], color="green", label="Mean")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Product")
+    ax.set_title("Product vs Time (replicate ensemble)")
+    ax.legend(loc="lower right", fontsize=8)
+    ax.grid(True)
+
+    return fig
+
+
+# Line colors of overlaid runs, in order
+COMPARISON_COLORS = ["green", "darkorange", "purple", "steelblue", "firebrick"]
+
+
+def render_comparison_plot(curves, fig=None):
+    """
+    Overlay product curves {label: (time, product)} of several runs
+    (arrays, or HistoryBuffers which are decimated).
+    """
+
+    # --- Create or reuse figure ---
+    if fig is None:
+        fig, ax = plt.subplots(figsize=(6, 4))
+    else:
+        ax = fig.axes[0] if fig.axes else fig.add_subplot(111)
+        ax.clear()
+
+    for k, (label, (time, product)) in enumerate(curves.items()):
+        ax.plot(*_curve(ax, time, product), color=COMPARISON_COLORS[k % len(COMPARISON_COLORS)], label=label)
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Product")
+    ax.set_title("Product vs Time")
+    if curves:
+        ax.legend(loc="lower right", fontsize=8)
+    ax.grid(True)
+
+    return fig
+
+
+def render_yield_map(temperatures, pHs, yields, marker=None, fig=None):
+    """
+    Heat map of product yield (rows: pHs, columns: temperatures), with an
+    optional (temperature, pH) marker for the current settings.
+    """
+
+    # --- Create or reuse figure (cleared whole: the colorbar is an axes too) ---
+    if fig is None:
+        fig = plt.figure(figsize=(6, 4))
+    else:
+        fig.clear()
+    ax = fig.add_subplot(111)
+
+    image = ax.pcolormesh(temperatures, pHs, yields, shading="nearest", cmap="viridis", vmin=0, vmax=1)
+    fig.colorbar(image, ax=ax, label="Yield (product / substrate)")
+    if marker is not None:
+        ax.plot(*marker, marker="x", color="red", markersize=10, mew=2)
+    ax.set_xlabel("Temp (°C)")
+    ax.set_ylabel("pH")
+    ax.set_title("Mean-field yield")
+
+    return fig
@@ -1,46 +1,126 @@
 # ui/visualization.py
+import math
+import weakref
+
+import numpy as np
 import matplotlib.pyplot as plt
 
+from simulation.snapshots import species_positions
+
+# --- Species styles (shared by every particle renderer) ---
+SPECIES_STYLES = {
+    "enzyme": {"label": "Enzyme", "color": "blue", "marker": "o", "size": 40},
+    "substrate": {"label": "Substrate", "color": "green", "marker": "s", "size": 20},
+    "product": {"label": "Product", "color": "red", "marker": "^", "size": 15},
+    "complex": {"label": "ES Complex", "color": "purple", "marker": "*", "size": 80},
+    "inhibitor": {"label": "Inhibitor", "color": "orange", "marker": "D", "size": 15},
+}
+
+# Renderers attached to the figures they draw on
+_renderers = weakref.WeakKeyDictionary()
+
+
+class SimulationRenderer:
+    """
+    Particle view that creates its axes and scatter artists once and then
+    only moves them (set_offsets) on every frame.
+    """
+
+    def __init__(self, width, height, fig=None):
+        if fig is None:
+            fig, ax = plt.subplots(figsize=(6, 4))
+        else:
+            ax = fig.axes[0] if fig.axes else fig.add_subplot(111)
+            ax.clear()
+        self.fig = fig
+        self.ax = ax
+
+        # Plot setup (done once)
+        ax.set_aspect('equal')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_facecolor('#f0f0f0')
+        self._set_limits(width, height)
+
+        empty = np.empty((0, 2))
+        self.artists = {
+            species: ax.scatter(empty[:, 0], empty[:, 1], s=style["size"], c=style["color"],
+                                marker=style["marker"], label=style["label"])
+            for species, style in SPECIES_STYLES.items()
+        }
+        ax.legend(loc='upper right', fontsize=8)
+
+    def _set_limits(self, width, height):
+        self.box = (width, height)
+        self.ax.set_xlim(0, width)
+        self.ax.set_ylim(0, height)
+
+    def update(self, positions, width, height):
+        """Move the existing artists to {species: (N, 2) positions}."""
+        if (width, height) != self.box:
+            self._set_limits(width, height)
+        for species, offsets in positions.items():
+            self.artists[species].set_offsets(offsets)
+        return self.fig
+
+
+def render_positions(positions, width, height, fig=None):
+    """
+    Render {species: (N, 2) positions} in a width x height box.
+    If fig is provided, reuse it (and its artists) to avoid rebuilding the plot each step.
+    """
+    renderer = _renderers.get(fig) if fig is not None else None
+    if renderer is None:
+        renderer = SimulationRenderer(width, height, fig)
+        _renderers[renderer.fig] = renderer
+    return renderer.update(positions, width, height)
+
+
 def render_simulation(sim, fig=None):
     """
     Render particle simulation.
-    If fig is provided, reuse it to avoid creating a new figure each step.
-    """
-    if fig is None:
-        fig, ax = plt.subplots(figsize=(6,4))
-    else:
-        ax = fig.axes[0] if fig.axes else fig.add_subplot(111)
-        ax.clear()  # clear previous plot
-
-    # Plot setup
-    ax.set_xlim(0, sim.width)
-    ax.set_ylim(0, sim.height)
-    ax.set_aspect('equal')
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.set_facecolor('#f0f0f0')
-
-    # Enzymes
-    ax.scatter([e.x for e in sim.enzymes],
-               [e.y for e in sim.enzymes],
-               s=40, c='blue', marker='o', label='Enzyme')
-
-    # Substrates
-    ax.scatter([s.x for s in sim.substrates],
-               [s.y for s in sim.substrates],
-               s=20, c='green', marker='s', label='Substrate')
-
-    # Products
-    ax.scatter([p.x for p in sim.products],
-               [p.y for p in sim.products],
-               s=15, c='red', marker='^', label='Product')
-
-    # ES Complexes
-    if sim.complexes:
-        ax.scatter([c.x for c in sim.complexes],
-                   [c.y for c in sim.complexes],
-                   s=80, c='purple', marker='*', label='ES Complex')
-
-    ax.legend(loc='upper right', fontsize=8)
-
-    return fig
+    If fig is provided, reuse it (and its artists) to avoid rebuilding the plot each step.
+    """
+    return render_positions(species_positions(sim), sim.width, sim.height, fig)
+
+
+class FrameScheduler:
+    """
+    Decide which simulation steps get drawn, so simulation rate and redraw
+    rate are decoupled.
+
+    With a fixed `every`, every k-th step is drawn. With every=None the
+    stride adapts to measured frame and step times, keeping the share of
+    wall time spent drawing near `render_share` (stride capped at `max_every`).
+    """
+
+    def __init__(self, every=None, render_share=0.5, max_every=20):
+        self.adaptive = every is None
+        self.every = 1 if every is None else max(int(every), 1)
+        self.render_share = render_share
+        self.max_every = max_every
+        self._frame_time = None
+        self._step_time = None
+        self._last = 0
+
+    def due(self, step):
+        """True if `step` should be drawn."""
+        return step - self._last >= self.every
+
+    @staticmethod
+    def _smooth(old, new):
+        return new if old is None else 0.8 * old + 0.2 * new
+
+    def record_steps(self, seconds, steps=1):
+        """Report wall time spent simulating `steps` steps."""
+        if steps > 0:
+            self._step_time = self._smooth(self._step_time, seconds / steps)
+
+    def record_frame(self, step, seconds):
+        """Report that `step` was drawn and how long drawing took."""
+        self._last = step
+        self._frame_time = self._smooth(self._frame_time, seconds)
+        if self.adaptive and self._step_time:
+            # frame / (frame + k * step) <= share  =>  k >= frame * (1 - share) / (share * step)
+            needed = self._frame_time * (1 - self.render_share) / (self.render_share * self._step_time)
+            self.every = min(max(math.ceil(needed), 1), self.max_every)